@@ -0,0 +1,226 @@
+"""
+Mergeable cohort summaries for sharded scoring.
+
+A `CohortSummary` accumulates the cohort totals of many assessments in a
+size that does not grow with the number of respondents:
+
+    profile counts             exact
+    tag co-occurrence counts   exact (the diagonal is the tag frequency)
+    per-question score counts  exact, one histogram per MCQ question
+    total score histogram      exact, so quantiles are exact too
+    sentiment counts           exact, per descriptive answer
+    recommendation counts      exact
+    top keywords               Space-Saving sketch, bounded error
+
+Merging is associative and commutative, so every shard can summarize its
+own results and ship one small JSON document:
+
+    shard = CohortSummary()
+    for output in results:
+        shard.add(output)
+    json.dump(shard.to_dict(), f)
+
+    fleet = merge_summaries(CohortSummary.from_dict(json.load(f)) for f in files)
+    fleet.quantiles([0.5, 0.9])
+"""
+import argparse
+import json
+import sys
+
+from mcq_module import PROFILES, QUESTIONS
+from result_types import TAG_NAMES, Sentiment
+from sketches import SpaceSaving
+
+MAX_QUESTION_SCORE = 3
+KEYWORD_CAPACITY = 1000
+
+class CohortSummary:
+    """Mergeable totals over the assessments of a cohort."""
+
+    def __init__(self, keyword_capacity=KEYWORD_CAPACITY):
+        self.respondents = 0
+        self.profile_counts = [0] * len(PROFILES)
+        self.tag_pairs = [[0] * len(TAG_NAMES) for _ in TAG_NAMES]
+        self.question_scores = [[0] * (MAX_QUESTION_SCORE + 1) for _ in QUESTIONS]
+        self.total_scores = [0] * (MAX_QUESTION_SCORE * len(QUESTIONS) + 1)
+        self.sentiment_counts = [0] * len(Sentiment)
+        self.recommendation_counts = {}
+        self.keywords = SpaceSaving(keyword_capacity)
+
+    def _add(self, profile_code, tag_codes, scores, sentiment_codes, keywords, recommendations):
+        self.respondents += 1
+        self.profile_counts[profile_code] += 1
+        for i in tag_codes:
+            row = self.tag_pairs[i]
+            for j in tag_codes:
+                row[j] += 1
+        for counts, score in zip(self.question_scores, scores):
+            counts[score] += 1
+        self.total_scores[sum(scores)] += 1
+        for code in sentiment_codes:
+            self.sentiment_counts[code] += 1
+        self.keywords.update(keywords)
+        for text in recommendations:
+            self.recommendation_counts[text] = self.recommendation_counts.get(text, 0) + 1
+
+    def add(self, output_data):
+        """Adds one assessment in the `main.process_submission` output format."""
+        user_input = output_data["user_input"]
+        system_output = output_data["system_output"]
+        nlp_analysis = system_output["nlp_analysis"]
+        self._add(
+            PROFILES.index(system_output["profile"]),
+            [TAG_NAMES.index(tag) for tag in nlp_analysis["all_tags"]],
+            [user_input["mcq_answers"][f"Q{i+1}"]["score"] for i in range(len(QUESTIONS))],
+            [Sentiment.from_label(a["sentiment"]) for a in nlp_analysis["individual_analysis"].values()],
+            nlp_analysis["all_keywords"],
+            [text for texts in system_output["recommendations"].values() for text in texts],
+        )
+
+    def add_result(self, result):
+        """Adds one result_types.AssessmentResult without building its dictionary."""
+        self._add(
+            result.profile_code,
+            [i for i in range(len(TAG_NAMES)) if result.tag_mask >> i & 1],
+            result.scores,
+            [int(answer.sentiment) for answer in result.answers],
+            result.all_keywords,
+            [text for texts in result.catalog.render(result.rec_bits).values() for text in texts],
+        )
+
+    def merge(self, other):
+        """Returns a new summary of both cohorts."""
+        merged = CohortSummary(self.keywords.capacity)
+        merged.respondents = self.respondents + other.respondents
+        merged.profile_counts = _add_lists(self.profile_counts, other.profile_counts)
+        merged.tag_pairs = [_add_lists(a, b) for a, b in zip(self.tag_pairs, other.tag_pairs)]
+        merged.question_scores = [_add_lists(a, b) for a, b in zip(self.question_scores, other.question_scores)]
+        merged.total_scores = _add_lists(self.total_scores, other.total_scores)
+        merged.sentiment_counts = _add_lists(self.sentiment_counts, other.sentiment_counts)
+        merged.recommendation_counts = dict(self.recommendation_counts)
+        for text, count in other.recommendation_counts.items():
+            merged.recommendation_counts[text] = merged.recommendation_counts.get(text, 0) + count
+        merged.keywords = self.keywords.merge(other.keywords)
+        return merged
+
+    def profile_distribution(self):
+        return dict(zip(PROFILES, self.profile_counts))
+
+    def tag_frequency(self):
+        return {tag: self.tag_pairs[i][i] for i, tag in enumerate(TAG_NAMES)}
+
+    def tag_cooccurrence(self):
+        return {tag: dict(zip(TAG_NAMES, row)) for tag, row in zip(TAG_NAMES, self.tag_pairs)}
+
+    def question_averages(self):
+        """Returns the mean score of each MCQ question (0 best, 3 worst)."""
+        if not self.respondents:
+            return [0.0] * len(QUESTIONS)
+        return [sum(score * n for score, n in enumerate(counts)) / self.respondents for counts in self.question_scores]
+
+    def quantile(self, q):
+        """Returns the smallest total MCQ score with at least a `q` share of respondents at or below it."""
+        if not self.respondents:
+            raise ValueError("quantile of an empty summary")
+        target = q * self.respondents
+        running = 0
+        for score, count in enumerate(self.total_scores):
+            running += count
+            if running >= target and running:
+                return score
+        return len(self.total_scores) - 1
+
+    def quantiles(self, qs):
+        return {q: self.quantile(q) for q in qs}
+
+    def top_keywords(self, k=10):
+        """Returns up to `k` (keyword, count, error) triples; counts are high by at most `error`."""
+        return self.keywords.most_common_with_errors(k)
+
+    def to_dict(self):
+        """Returns a compact JSON-serializable representation."""
+        return {
+            "profiles": PROFILES,
+            "tags": TAG_NAMES,
+            "respondents": self.respondents,
+            "profile_counts": self.profile_counts,
+            "tag_pairs": self.tag_pairs,
+            "question_scores": self.question_scores,
+            "total_scores": self.total_scores,
+            "sentiment_counts": self.sentiment_counts,
+            "recommendation_counts": self.recommendation_counts,
+            "keywords": self.keywords.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data["profiles"] != PROFILES or data["tags"] != TAG_NAMES:
+            raise ValueError("Summary was built with different profiles or tags")
+        summary = cls(data["keywords"]["capacity"])
+        summary.respondents = data["respondents"]
+        summary.profile_counts = data["profile_counts"]
+        summary.tag_pairs = data["tag_pairs"]
+        summary.question_scores = data["question_scores"]
+        summary.total_scores = data["total_scores"]
+        summary.sentiment_counts = data["sentiment_counts"]
+        summary.recommendation_counts = data["recommendation_counts"]
+        summary.keywords = SpaceSaving.from_dict(data["keywords"])
+        return summary
+
+    def report(self, k=10):
+        """Returns the cohort report as a dictionary."""
+        return {
+            "respondents": self.respondents,
+            "profile_distribution": self.profile_distribution(),
+            "tag_frequency": self.tag_frequency(),
+            "tag_cooccurrence": self.tag_cooccurrence(),
+            "question_averages": self.question_averages(),
+            "total_score_quantiles": self.quantiles([0.25, 0.5, 0.75, 0.9]) if self.respondents else {},
+            "sentiment_counts": {sentiment.label: count for sentiment, count in zip(Sentiment, self.sentiment_counts)},
+            "recommendation_counts": self.recommendation_counts,
+            "top_keywords": self.top_keywords(k),
+        }
+
+def _add_lists(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+def merge_summaries(summaries):
+    """Merges summaries from any number of shards, in order."""
+    merged = None
+    for summary in summaries:
+        merged = summary if merged is None else merged.merge(summary)
+    return merged if merged is not None else CohortSummary()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize and merge cohort summaries.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summarize = subparsers.add_parser("summarize", help="Summarize a JSONL file of results (as written by main.py --batch).")
+    summarize.add_argument("results", help="Results JSONL file.")
+    summarize.add_argument("--out", required=True, help="Where to write the summary JSON.")
+    merge = subparsers.add_parser("merge", help="Merge shard summaries and print the cohort report.")
+    merge.add_argument("summaries", nargs="+", help="Summary JSON files.")
+    merge.add_argument("--out", help="Also write the merged summary JSON here.")
+    args = parser.parse_args(argv)
+
+    if args.command == "summarize":
+        summary = CohortSummary()
+        with open(args.results, encoding="utf-8") as f:
+            for line in f:
+                output_data = json.loads(line)
+                if "error" not in output_data:
+                    summary.add(output_data)
+    else:
+        summaries = []
+        for path in args.summaries:
+            with open(path, encoding="utf-8") as f:
+                summaries.append(CohortSummary.from_dict(json.load(f)))
+        summary = merge_summaries(summaries)
+        json.dump(summary.report(), sys.stdout, indent=2)
+        print()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(), f, separators=(",", ":"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+def make_key(text, fingerprint):
+    """
+    Builds a content-addressed cache key for a text.
+
+    The text is lowercased, since the analysis ignores case, so "Phone" and
+    "phone" share an entry. Surrounding whitespace is kept: the cached edges
+    of a text decide which phrases match across a merge, so "I put " and
+    "I put" must not share one. The fingerprint identifies the lexicons and
+    analyzer settings; when they change, every key changes with them and old
+    entries are never returned.
+    """
+    normalized = text.lower()
+    return hashlib.sha256(f"{fingerprint}\0{normalized}".encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """
+    A two-tier cache for per-text analysis results.
+
+    The first tier is a bounded in-process LRU. The optional second tier is a
+    SQLite file that worker processes on the same host can share. Values must
+    be JSON-serializable.
+    """
+
+    def __init__(self, maxsize=10000, sqlite_path=None):
+        """
+        Args:
+            maxsize (int): Maximum number of entries kept in memory.
+            sqlite_path (str): Path of the shared SQLite database, or None for memory only.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.sqlite_path = sqlite_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _db(self):
+        """Returns this process's SQLite connection, opening it on first use."""
+        # A connection must not be shared across fork(), so each process opens its own.
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.sqlite_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _remember(self, key, value):
+        """Adds an entry to the memory tier, evicting the least recently used one if full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """Returns the cached value for a key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self.sqlite_path is not None:
+                row = self._db().execute("SELECT value FROM analysis WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value, fingerprint=""):
+        """Stores a value in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+            if self.sqlite_path is not None:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO analysis (key, fingerprint, value) VALUES (?, ?, ?)",
+                    (key, fingerprint, json.dumps(value, separators=(",", ":"))),
+                )
+                db.commit()
+
+    def purge_stale(self, fingerprint):
+        """Deletes on-disk entries written under any other fingerprint."""
+        if self.sqlite_path is None:
+            return 0
+        with self._lock:
+            db = self._db()
+            deleted = db.execute("DELETE FROM analysis WHERE fingerprint != ?", (fingerprint,)).rowcount
+            db.commit()
+            return deleted
+
+    def clear(self):
+        """Empties the memory tier and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the hit, miss and eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -1,8 +1,19 @@
+import os
 import streamlit as st
 import time
-from mcq_module import QUESTIONS, get_productivity_profile
-from nlp_module import analyze_descriptive_answers
-from recommendation_module import get_recommendations
+from mcq_module import QUESTIONS, score_choice, get_productivity_profile
+from nlp_module import analyze_descriptive_answers, analyze_partial, get_stop_words
+from recommendation_module import get_catalog
+from report_module import get_fragments
+from instrumentation import instrumented, timer
+
+# --- Pacing ---
+# "timer" waits COACH_PACING_DELAY seconds before each reply by stamping the
+# reply time in the session and rerunning when it is due, so no server thread
+# is held. "sleep" blocks in time.sleep instead (for the headless load test,
+# which does not run rerun timers). "off" replies immediately.
+PACING = os.environ.get("COACH_PACING", "timer")
+PACING_DELAY = float(os.environ.get("COACH_PACING_DELAY", "0.5"))
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -17,33 +28,70 @@ DESCRIPTIVE_QUESTIONS = [
     "When do you feel most focused and energized during the day?"
 ]
 
+# --- Shared Resources ---
+@st.cache_resource
+def load_shared_resources():
+    """Loads the stopwords, tokenizer and recommendation catalog once per server process, not per session."""
+    get_stop_words()
+    analyze_partial("warm up")  # Loads the tokenizer.
+    get_catalog()
+
+@st.cache_resource
+def render_question(stage, q_index):
+    """Builds the markdown for a question once, shared by every session."""
+    if stage == "mcq":
+        q_data = QUESTIONS[q_index]
+        question_text = f"**Question {q_index + 1}/{len(QUESTIONS)}:**\n\n{q_data['question']}"
+        options_text = "\n".join([f"{i+1}. {opt}" for i, opt in enumerate(q_data['options'])])
+        return f"{question_text}\n\n{options_text}\n\nPlease type a number from 1 to 4."
+    question = DESCRIPTIVE_QUESTIONS[q_index]
+    return f"**Follow-up Question {q_index + 1}/{len(DESCRIPTIVE_QUESTIONS)}:**\n\n{question}"
+
+REPORT_INTRO = "Great, thank you! I've analyzed your responses. Here is your personalized productivity analysis:"
+
+def message_content(message):
+    """Returns the markdown of a chat message. Questions and reports are stored as references, not text."""
+    if "question" in message:
+        return render_question(*message["question"])
+    if "report" in message:
+        profile, tags = message["report"]
+        return f"{REPORT_INTRO}\n\n{get_fragments(profile, list(tags)).markdown}"
+    return message["content"]
+
+load_shared_resources()
+
 # --- Session State Initialization ---
 if "stage" not in st.session_state:
     st.session_state.stage = "start"
     st.session_state.messages = [{"role": "assistant", "content": "Hello! I'm here to help you understand your productivity patterns. Let's start with a few questions. Type 'start' or anything else to begin."}]
     st.session_state.mcq_answers = []
     st.session_state.desc_answers = {}
+    st.session_state.desc_partials = {}
     st.session_state.q_index = 0
     st.session_state.results = {}
 
 # --- Helper Functions ---
+def reply_due():
+    """True once the pacing delay after the user's last message has passed."""
+    return PACING != "timer" or time.time() >= st.session_state.get("reply_at", 0)
+
+@st.fragment(run_every=PACING_DELAY if PACING_DELAY > 0 else None)
+def wait_for_reply():
+    """Shows the pause before a reply and reruns the app once it is over."""
+    if reply_due():
+        st.rerun()
+    with st.chat_message("assistant"):
+        st.markdown("_Thinking..._")
+
 def ask_question():
     """Determines which question to ask based on the current stage."""
-    if st.session_state.stage == "mcq":
-        q_data = QUESTIONS[st.session_state.q_index]
-        question_text = f"**Question {st.session_state.q_index + 1}/{len(QUESTIONS)}:**\n\n{q_data['question']}"
-        options_text = "\n".join([f"{i+1}. {opt}" for i, opt in enumerate(q_data['options'])])
-        prompt = f"{question_text}\n\n{options_text}\n\nPlease type a number from 1 to 4."
-    
-    elif st.session_state.stage == "descriptive":
-        question = DESCRIPTIVE_QUESTIONS[st.session_state.q_index]
-        prompt = f"**Follow-up Question {st.session_state.q_index + 1}/{len(DESCRIPTIVE_QUESTIONS)}:**\n\n{question}"
-    
-    else:
+    if st.session_state.stage not in ("mcq", "descriptive"):
         return
 
-    st.session_state.messages.append({"role": "assistant", "content": prompt})
+    # Only a reference is kept in the session; the text is shared via render_question.
+    st.session_state.messages.append({"role": "assistant", "question": (st.session_state.stage, st.session_state.q_index)})
 
+@instrumented("app.calculate_results")
 def calculate_and_display_results():
     """Calculates final results and saves them to the chat history for display."""
     with st.spinner("Analyzing your responses..."):
@@ -51,54 +99,34 @@ def calculate_and_display_results():
         total_score = sum(st.session_state.mcq_answers)
         profile = get_productivity_profile(total_score, len(QUESTIONS))
         
-        # 2. Analyze Descriptive Answers
-        nlp_analysis = analyze_descriptive_answers(st.session_state.desc_answers)
+        # 2. Analyze Descriptive Answers (each answer was already analyzed on submit, so this only merges)
+        nlp_analysis = analyze_descriptive_answers(st.session_state.desc_answers, partials=st.session_state.desc_partials)
         tags = nlp_analysis.get('all_tags', [])
-        
-        # 3. Generate Summary
-        summary_text = f"Your results show you're in the **'{profile}'** category. "
-        if tags:
-            summary_text += f"We noticed patterns related to **{', '.join(tags)}**. Based on this, here are some personalized recommendations."
-        else:
-            summary_text += "You seem to have a solid foundation. Here are some general tips."
-
-        # 4. Get Recommendations
-        recommendations = get_recommendations(profile, tags)
-        
-        # 5. Build the final results markdown string
-        results_md = f"""
-        Great, thank you! I've analyzed your responses. Here is your personalized productivity analysis:
 
-        ### 👤 Your Productivity Profile: {profile}
-        
-        *{summary_text}*
-        """
-        
-        if recommendations['Basic (Free)']:
-            basic_recs = "\n".join([f"- {rec}" for rec in recommendations['Basic (Free)']])
-            results_md += f"\n\n#### Basic (Free) Recommendations\n{basic_recs}"
-            
-        if recommendations['Premium (Advanced)']:
-            premium_recs = "\n".join([f"- {rec}" for rec in recommendations['Premium (Advanced)']])
-            results_md += f"\n\n#### Premium (Advanced) Recommendations\n{premium_recs}"
+        # 3. Render the report once per (profile, tags) for all sessions
+        get_fragments(profile, tags)
     
-    # Add final results to chat history and set stage to finished
-    st.session_state.messages.append({"role": "assistant", "content": results_md})
+    # Add final results to chat history and set stage to finished; only a reference is kept
+    st.session_state.messages.append({"role": "assistant", "report": (profile, tuple(tags))})
     st.session_state.stage = "finished"
 
 # --- Main App Logic ---
 
 # Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+with timer("app.render_history"):
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message_content(message))
 
 # Main conversation flow
 if st.session_state.stage != "finished":
     # Ask the next question if it hasn't been asked yet
-    if st.session_state.messages[-1]["role"] == "user":
+    if st.session_state.messages[-1]["role"] == "user" and not reply_due():
+        wait_for_reply()
+    elif st.session_state.messages[-1]["role"] == "user":
         with st.spinner("Thinking..."):
-            time.sleep(0.5)
+            if PACING == "sleep":
+                time.sleep(PACING_DELAY)
             if st.session_state.stage == "mcq" and st.session_state.q_index < len(QUESTIONS):
                 ask_question()
             elif st.session_state.stage == "descriptive" and st.session_state.q_index < len(DESCRIPTIVE_QUESTIONS):
@@ -110,6 +138,7 @@ if st.session_state.stage != "finished":
     # Handle user input
     if prompt := st.chat_input("Your response..."):
         st.session_state.messages.append({"role": "user", "content": prompt})
+        st.session_state.reply_at = time.time() + PACING_DELAY
         
         # --- STAGE: START ---
         if st.session_state.stage == "start":
@@ -122,9 +151,7 @@ if st.session_state.stage != "finished":
                 if not 1 <= choice <= 4: raise ValueError
                 
                 q_data = QUESTIONS[st.session_state.q_index]
-                score = choice - 1
-                if q_data.get("reversed", False): score = 3 - score
-                st.session_state.mcq_answers.append(score)
+                st.session_state.mcq_answers.append(score_choice(q_data, choice))
                 
                 st.session_state.q_index += 1
                 if st.session_state.q_index == len(QUESTIONS):
@@ -137,6 +164,7 @@ if st.session_state.stage != "finished":
         elif st.session_state.stage == "descriptive":
             q_key = f"desc_q_{st.session_state.q_index}"
             st.session_state.desc_answers[q_key] = prompt
+            st.session_state.desc_partials[q_key] = analyze_partial(prompt)
             
             st.session_state.q_index += 1
             if st.session_state.q_index == len(DESCRIPTIVE_QUESTIONS):
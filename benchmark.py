@@ -0,0 +1,251 @@
+"""
+Benchmarks for every pipeline stage and the end-to-end flow.
+
+Each stage runs over synthetic corpora (see synthetic_data.py) at several
+corpus sizes and answer lengths, and reports throughput and peak memory.
+Results can be saved as a baseline and later compared against it:
+
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.2 --memory-threshold 0.2
+
+The comparison exits with status 1 if any case got slower than the baseline
+by more than the threshold (a fraction of the baseline throughput), or if its
+peak memory grew by more than the memory threshold (a fraction of the
+baseline peak, plus MEMORY_SLACK_BYTES).
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import nlp_module
+from cohort_module import score_cohort
+from corpus_module import analyze_corpus
+from main import process_submission
+from mcq_module import get_productivity_profile, score_mcq_choices
+from recommendation_module import get_recommendations
+from result_types import AssessmentResult
+from synthetic_data import generate_submissions
+
+DEFAULT_SIZES = [100, 1000]
+DEFAULT_LENGTHS = [10, 50, 200]
+QUICK_SIZES = [100]
+QUICK_LENGTHS = [10, 50]
+
+def _texts(corpus):
+    return [answer for submission in corpus for answer in submission["descriptive_answers"].values()]
+
+def _stages(tokenizer):
+    """
+    Returns (name, depends_on_length, prepare, run) for each stage. `prepare`
+    turns a corpus into the stage's inputs, and `run` processes them all.
+    """
+    return [
+        ("extract_keywords", True, _texts,
+            lambda texts: [nlp_module.extract_keywords(t, tokenizer) for t in texts]),
+        ("analyze_sentiment", True, _texts,
+            lambda texts: [nlp_module.analyze_sentiment(t) for t in texts]),
+        ("get_behavioral_tags", True, _texts,
+            lambda texts: [nlp_module.get_behavioral_tags(t) for t in texts]),
+        ("analyze_text", True, _texts,
+            lambda texts: [nlp_module.analyze_text(t, tokenizer) for t in texts]),
+        ("analyze_corpus", True, _texts,
+            lambda texts: analyze_corpus(texts, tokenizer)),
+        ("analyze_descriptive_answers", True, lambda corpus: [s["descriptive_answers"] for s in corpus],
+            lambda answers: [nlp_module.analyze_descriptive_answers(a, tokenizer) for a in answers]),
+        ("get_recommendations", False,
+            lambda corpus: [(get_productivity_profile(score_mcq_choices(s["mcq_choices"])[0]),
+                             nlp_module.get_behavioral_tags(" ".join(s["descriptive_answers"].values())))
+                            for s in corpus],
+            lambda pairs: [get_recommendations(profile, tags) for profile, tags in pairs]),
+        ("score_mcq_choices", False, lambda corpus: [s["mcq_choices"] for s in corpus],
+            lambda choices: [score_mcq_choices(c) for c in choices]),
+        ("score_cohort", False, lambda corpus: [s["mcq_choices"] for s in corpus],
+            score_cohort),
+        ("end_to_end", True, lambda corpus: corpus,
+            lambda corpus: [process_submission(s) for s in corpus]),
+    ]
+
+def measure(run, inputs, repeat, min_time=0.2):
+    """
+    Times a stage `repeat` times and returns (best items/sec, peak memory in bytes).
+    Each timing loops over the inputs for at least `min_time` seconds so small
+    cases are not dominated by timer noise.
+    """
+    best = 0
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            run(inputs)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, loops * len(inputs) / elapsed)
+
+    tracemalloc.start()
+    run(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def run_benchmarks(sizes, lengths, repeat=5, tokenizer=None, stages=None, seed=0):
+    """
+    Runs all benchmark cases.
+
+    Returns:
+        A dictionary mapping "stage|size|length" to {"ops_per_sec", "peak_bytes"}.
+    """
+    # The cache would turn repeated runs into lookups, so it is off while benchmarking.
+    nlp_module.disable_cache()
+    results = {}
+    for size in sizes:
+        for i, length in enumerate(lengths):
+            corpus = list(generate_submissions(size, length, seed))
+            for name, depends_on_length, prepare, run in _stages(tokenizer):
+                if stages and name not in stages:
+                    continue
+                if not depends_on_length and i > 0:
+                    continue  # Same inputs for every length, so measure once.
+                inputs = prepare(corpus)
+                run(inputs[:10])  # Warm up lazy loading and caches.
+                ops, peak = measure(run, inputs, repeat)
+                key = f"{name}|{size}|{length if depends_on_length else '-'}"
+                results[key] = {"ops_per_sec": ops, "peak_bytes": peak}
+                print(f"{name:<28} n={size:<6} words={length if depends_on_length else '-':<5} "
+                      f"{ops:>12,.0f} ops/s {peak / 1024:>10,.0f} KiB peak", flush=True)
+    return results
+
+def measure_result_memory(count, length=20, seed=0):
+    """
+    Compares the memory held by `count` results as nested dicts (the output of
+    main.process_submission) and as compact AssessmentResult objects.
+
+    Returns:
+        A dictionary with the bytes per result of each representation.
+    """
+    nlp_module.disable_cache()
+    corpus = list(generate_submissions(count, length, seed))
+    process_submission(corpus[0])  # Load lazy resources before measuring.
+    AssessmentResult.from_submission(corpus[0])
+
+    sizes = {}
+    for name, build in (("dict", process_submission), ("compact", AssessmentResult.from_submission)):
+        tracemalloc.start()
+        results = [build(submission) for submission in corpus]
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sizes[name] = held / count
+        del results
+    return sizes
+
+# (faster, slower) stage pairs: a batch engine must keep up with the loop it
+# replaces. With the NLTK tokenizer on long answers both are bound by the
+# tokenizer and close to even, so a small margin is allowed for timer noise.
+SPEEDUP_CHECKS = [("analyze_corpus", "analyze_text")]
+SPEEDUP_TOLERANCE = 0.1
+
+def check_speedups(results):
+    """
+    Compares each batch engine with its per-item loop on the same cases.
+
+    Returns:
+        A list of messages, one per case where the batch engine was slower
+        than the loop by more than SPEEDUP_TOLERANCE.
+    """
+    failures = []
+    for key, current in results.items():
+        stage, case = key.split("|", 1)
+        for faster, slower in SPEEDUP_CHECKS:
+            loop = results.get(f"{slower}|{case}")
+            if stage != faster or loop is None:
+                continue
+            speedup = current["ops_per_sec"] / loop["ops_per_sec"]
+            print(f"{faster} vs {slower} ({case.replace('|', ', ')}): {speedup:.2f}x")
+            if speedup < 1 - SPEEDUP_TOLERANCE:
+                failures.append(f"{key}: {speedup:.2f}x the throughput of {slower}")
+    return failures
+
+# Small peaks vary by a few allocator blocks between runs, so growth below
+# this many bytes never counts as a memory regression.
+MEMORY_SLACK_BYTES = 64 * 1024
+
+def compare(results, baseline, threshold, memory_threshold=0.2):
+    """
+    Compares results against a baseline.
+
+    Returns:
+        A list of messages, one per throughput or peak memory regression
+        past its threshold.
+    """
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        floor = base["ops_per_sec"] * (1 - threshold)
+        if current["ops_per_sec"] < floor:
+            change = current["ops_per_sec"] / base["ops_per_sec"] - 1
+            regressions.append(f"{key}: {current['ops_per_sec']:,.0f} ops/s vs baseline {base['ops_per_sec']:,.0f} ({change:+.0%})")
+        ceiling = base["peak_bytes"] * (1 + memory_threshold) + MEMORY_SLACK_BYTES
+        if current["peak_bytes"] > ceiling:
+            change = current["peak_bytes"] / max(base["peak_bytes"], 1) - 1
+            regressions.append(f"{key}: {current['peak_bytes']:,} peak bytes vs baseline {base['peak_bytes']:,} ({change:+.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the assessment pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Corpus sizes (respondents).")
+    parser.add_argument("--lengths", type=int, nargs="+", help="Words per descriptive answer.")
+    parser.add_argument("--quick", action="store_true", help="Use a small set of cases.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest is kept.")
+    parser.add_argument("--tokenizer", help="Tokenizer backend (see nlp_module.TOKENIZERS).")
+    parser.add_argument("--stage", action="append", help="Only run these stages.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a new baseline.")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail if results regress against this baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown as a fraction (default 0.2).")
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="Allowed peak memory growth as a fraction (default 0.2).")
+    parser.add_argument("--result-memory", type=int, metavar="N", help="Only compare memory of N dict vs compact results.")
+    args = parser.parse_args(argv)
+
+    if args.result_memory:
+        sizes = measure_result_memory(args.result_memory, (args.lengths or [20])[0], args.seed)
+        for name, per_result in sizes.items():
+            print(f"{name:<8} {per_result:>8,.0f} bytes/result  {per_result * 1e6 / 2**30:>6.2f} GiB per million")
+        print(f"compact results use {sizes['compact'] / sizes['dict']:.0%} of the dict representation")
+        return 0
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    lengths = args.lengths or (QUICK_LENGTHS if args.quick else DEFAULT_LENGTHS)
+    results = run_benchmarks(sizes, lengths, args.repeat, args.tokenizer, args.stage, args.seed)
+
+    failures = check_speedups(results)
+    if failures:
+        print(f"\n{len(failures)} batch case(s) were slower than their per-item loop:")
+        for message in failures:
+            print(f"  {message}")
+        return 1
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print(f"\nSaved baseline to {args.save_baseline}.")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+        limits = f"{args.threshold:.0%} throughput or {args.memory_threshold:.0%} memory"
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {limits}:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print(f"\nNo regressions beyond {limits} against {args.baseline}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import numpy as np
+from instrumentation import instrumented
+from mcq_module import QUESTIONS, PROFILES, get_profile_thresholds
+
+# Reversal mask and profile labels, built once from QUESTIONS.
+REVERSED_MASK = np.array([bool(q.get("reversed")) for q in QUESTIONS])
+PROFILE_LABELS = np.array(PROFILES)
+NUM_OPTIONS = 4
+
+def score_choice_matrix(choices):
+    """
+    Scores a whole cohort at once.
+
+    Args:
+        choices: An (n_respondents x n_questions) array of 1-based option numbers.
+
+    Returns:
+        An (n_respondents x n_questions) array of scores, 0 for best and 3 for worst.
+    """
+    choices = np.asarray(choices)
+    if choices.ndim != 2 or choices.shape[1] != len(QUESTIONS):
+        raise ValueError(f"Expected a (n_respondents x {len(QUESTIONS)}) choice matrix, got shape {choices.shape}.")
+    if not np.issubdtype(choices.dtype, np.integer):
+        raise ValueError(f"Choices must be whole option numbers, got an array of {choices.dtype}.")
+    if choices.size and (choices.min() < 1 or choices.max() > NUM_OPTIONS):
+        raise ValueError(f"Choices must be numbers between 1 and {NUM_OPTIONS}.")
+
+    scores = choices.astype(np.int8) - 1
+    # Reversed questions, where "Almost Always" is a good thing, are flipped in one operation.
+    return np.where(REVERSED_MASK, (NUM_OPTIONS - 1) - scores, scores)
+
+def classify_totals(totals, num_questions=len(QUESTIONS)):
+    """Maps an array of total scores to profile indices into `PROFILES`."""
+    thresholds = np.asarray(get_profile_thresholds(num_questions))
+    # side="left" keeps a score equal to a threshold in the lower profile.
+    return np.searchsorted(thresholds, totals, side="left")
+
+@instrumented("mcq.score_cohort")
+def score_cohort(choices):
+    """
+    Scores a cohort and summarizes it.
+
+    Args:
+        choices: An (n_respondents x n_questions) array of 1-based option numbers.
+
+    Returns:
+        A dictionary with the per-question "scores" matrix, the "totals" per
+        respondent, their "profiles" labels and the per-question score
+        "distributions" (an n_questions x 4 array of counts for scores 0-3).
+    """
+    scores = score_choice_matrix(choices)
+    totals = scores.sum(axis=1, dtype=np.int64)
+    profiles = PROFILE_LABELS[classify_totals(totals)]
+
+    num_questions = scores.shape[1]
+    offsets = np.arange(num_questions) * NUM_OPTIONS
+    distributions = np.bincount(
+        (scores + offsets).ravel(), minlength=num_questions * NUM_OPTIONS
+    ).reshape(num_questions, NUM_OPTIONS)
+
+    return {
+        "scores": scores,
+        "totals": totals,
+        "profiles": profiles,
+        "distributions": distributions,
+    }
@@ -0,0 +1,23 @@
+import pytest
+
+import nlp_module
+
+# A small stand-in for NLTK's English stopwords, so tests don't need NLTK data.
+STUB_STOP_WORDS = frozenset([
+    "i", "me", "my", "a", "an", "the", "and", "or", "but", "to", "of", "in",
+    "on", "at", "for", "with", "is", "am", "are", "was", "it", "when", "then",
+    "can", "not", "do", "so", "very", "just", "off", "up", "get",
+])
+
+@pytest.fixture
+def stub_stop_words(monkeypatch):
+    """Replaces the NLTK stopwords with STUB_STOP_WORDS."""
+    monkeypatch.setattr(nlp_module, "get_stop_words", lambda: STUB_STOP_WORDS)
+    nlp_module.get_lexicon_fingerprint.cache_clear()
+    yield STUB_STOP_WORDS
+    nlp_module.get_lexicon_fingerprint.cache_clear()
+
+@pytest.fixture
+def regex_tokenizer(monkeypatch, stub_stop_words):
+    """Makes the regex tokenizer the default, so tests run without NLTK data."""
+    monkeypatch.setattr(nlp_module, "DEFAULT_TOKENIZER", "regex")
@@ -0,0 +1,223 @@
+"""
+Corpus-scale sentiment, tag and keyword scoring with sparse matrices.
+
+A batch of texts is turned into two CSR (compressed sparse row) matrices:
+
+    phrases: documents x lexicon phrases, 1 where the phrase occurs
+    terms:   documents x keywords, with keyword counts
+
+Both are built from the whole batch at once rather than text by text. The
+lowercased texts are joined with a separator that no phrase contains, each
+lexicon phrase is located by splitting the joined corpus on it, and
+punctuation is removed in one pass. Tokens are mapped to integer ids and
+counted per document with `np.unique`.
+
+Everything else is vectorized over those matrices: sentiment is a
+matrix-vector product with +1/-1 lexicon weights, tags are a product with a
+phrase x tag membership matrix, top keywords are one lexsort over all
+documents, and corpus-wide keyword frequencies are the column sums of the
+term matrix. Results match `analyze_text` per document.
+
+The phrase columns are substring matches rather than token n-grams,
+because the lexicons match substrings ("plan" also matches "planning"),
+which token columns could not reproduce exactly.
+"""
+from itertools import chain
+
+import numpy as np
+
+import nlp_module
+from instrumentation import instrumented
+from nlp_module import BEHAVIORAL_TAG_MAP, LEXICON_MATCHER, PUNCTUATION_RE
+
+class CSRMatrix:
+    """A minimal compressed sparse row matrix on top of NumPy arrays."""
+
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.int64)
+        self.shape = shape
+
+    @classmethod
+    def from_rows(cls, rows, n_cols):
+        """Builds a matrix from a list of rows, each a list of (column, value) pairs."""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in rows])
+        indices = np.fromiter((col for row in rows for col, _ in row), dtype=np.int64, count=indptr[-1])
+        data = np.fromiter((value for row in rows for _, value in row), dtype=np.int64, count=indptr[-1])
+        return cls(indptr, indices, data, (len(rows), n_cols))
+
+    def _row_ids(self):
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def dot(self, dense):
+        """Multiplies by a dense vector (n_cols,) or matrix (n_cols x k)."""
+        dense = np.asarray(dense)
+        rows = self._row_ids()
+        if dense.ndim == 1:
+            return np.bincount(rows, weights=self.data * dense[self.indices], minlength=self.shape[0])
+        return np.stack(
+            [np.bincount(rows, weights=self.data * dense[self.indices, j], minlength=self.shape[0]) for j in range(dense.shape[1])],
+            axis=1,
+        )
+
+    def column_sums(self):
+        return np.bincount(self.indices, weights=self.data, minlength=self.shape[1]).astype(np.int64)
+
+    def row(self, i):
+        """Returns the (columns, values) of one row, in stored order."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+def _lexicon_weights():
+    """Builds the +1/-1 sentiment weights and the tag membership matrix over phrase ids."""
+    n_phrases = len(LEXICON_MATCHER.phrases)
+    tags = list(BEHAVIORAL_TAG_MAP)
+    sentiment = np.zeros(n_phrases, dtype=np.int64)
+    membership = np.zeros((n_phrases, len(tags)), dtype=np.int64)
+    for phrase_id, labels in enumerate(LEXICON_MATCHER.phrase_labels):
+        for kind, name in labels:
+            if kind == "sentiment":
+                sentiment[phrase_id] += 1 if name == "positive" else -1
+            else:
+                membership[phrase_id, tags.index(name)] += 1
+    return sentiment, membership, tags
+
+SENTIMENT_WEIGHTS, TAG_MEMBERSHIP, TAG_NAMES = _lexicon_weights()
+SENTIMENT_LABELS = np.array(["Negative", "Neutral", "Positive"])
+TAG_LISTS = [[tag for j, tag in enumerate(TAG_NAMES) if mask >> j & 1] for mask in range(1 << len(TAG_NAMES))]
+
+# Joins the texts of a batch. It is not whitespace, punctuation or a letter,
+# and no lexicon phrase contains it, so it neither creates keywords nor lets a
+# phrase match across two texts.
+SEPARATOR = "\x00"
+
+class CorpusMatrices:
+    """The phrase and term matrices of a batch of texts."""
+
+    def __init__(self, phrases, terms, vocabulary):
+        self.phrases = phrases
+        self.terms = terms
+        self.vocabulary = vocabulary
+
+    def sentiment(self):
+        """Returns the sentiment label of every document."""
+        scores = self.phrases.dot(SENTIMENT_WEIGHTS)
+        return SENTIMENT_LABELS[np.sign(scores).astype(np.int64) + 1]
+
+    def tag_matrix(self):
+        """Returns a documents x tags boolean matrix (columns in TAG_NAMES order)."""
+        return self.phrases.dot(TAG_MEMBERSHIP) > 0
+
+    def tags(self):
+        """Returns the tag list of every document."""
+        masks = self.tag_matrix().astype(np.int64) @ (1 << np.arange(len(TAG_NAMES), dtype=np.int64))
+        return [list(TAG_LISTS[mask]) for mask in masks.tolist()]
+
+    def keywords(self, k=5):
+        """Returns the top `k` keywords of every document."""
+        terms = self.terms
+        rows = terms._row_ids()
+        # Rows keep their keywords in first-occurrence order, so the position
+        # within the row breaks ties the same way as Counter.most_common.
+        within = np.arange(len(rows)) - terms.indptr[rows]
+        order = np.lexsort((within, -terms.data, rows))
+        top = order[within < k]  # Sorting keeps rows contiguous with the same lengths.
+        words = np.array(self.vocabulary, dtype=object)[terms.indices[top]].tolist()
+        ends = np.cumsum(np.minimum(np.diff(terms.indptr), k)).tolist()
+        return [words[start:end] for start, end in zip([0] + ends, ends)]
+
+    def corpus_keywords(self, k=5):
+        """Returns the `k` most frequent keywords of the whole corpus with their counts."""
+        sums = self.terms.column_sums()
+        order = np.argsort(-sums, kind="stable")[:k]
+        return [(self.vocabulary[c], int(sums[c])) for c in order]
+
+    def analyses(self, k=5):
+        """Returns one {"sentiment", "keywords", "tags"} dictionary per document."""
+        return [
+            {"sentiment": sentiment, "keywords": keywords, "tags": tags}
+            for sentiment, keywords, tags in zip(self.sentiment().tolist(), self.keywords(k), self.tags())
+        ]
+
+def _phrase_matrix(corpus, starts):
+    """Finds which documents of the joined corpus contain each lexicon phrase."""
+    n_docs = len(starts) - 1
+    starts = np.asarray(starts, dtype=np.int64)
+    docs, phrase_ids = [], []
+    for phrase_id, phrase in enumerate(LEXICON_MATCHER.phrases):
+        if not phrase:
+            found = np.arange(n_docs)  # The empty string is "in" every text.
+        else:
+            # Splitting on the phrase finds its non-overlapping occurrences in C;
+            # that includes the first occurrence in every document containing it.
+            pieces = np.fromiter(map(len, corpus.split(phrase)), dtype=np.int64)
+            positions = np.cumsum(pieces[:-1] + len(phrase)) - len(phrase)
+            found = np.unique(np.searchsorted(starts, positions, side="right") - 1)
+        docs.append(found)
+        phrase_ids.append(np.full(len(found), phrase_id, dtype=np.int64))
+    docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int64)
+    phrase_ids = np.concatenate(phrase_ids) if phrase_ids else np.zeros(0, dtype=np.int64)
+    order = np.lexsort((phrase_ids, docs))
+    indptr = np.zeros(n_docs + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(docs, minlength=n_docs))
+    return CSRMatrix(indptr, phrase_ids[order], np.ones(len(order), dtype=np.int64), (n_docs, len(LEXICON_MATCHER.phrases)))
+
+def _term_matrix(docs, tokenizer):
+    """Counts the keywords of punctuation-free, lowercased documents."""
+    tokenize = nlp_module.get_tokenizer(tokenizer)
+    stop_words = nlp_module.get_stop_words()
+    tokens = [tokenize(doc) for doc in docs]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    flat = list(chain.from_iterable(tokens))
+
+    # Token types in order of first occurrence in the corpus, and an id per token.
+    types = list(dict.fromkeys(flat))
+    type_ids = {token: i for i, token in enumerate(types)}
+    ids = np.fromiter(map(type_ids.__getitem__, flat), dtype=np.int64, count=len(flat))
+    is_keyword = np.array([token.isalpha() and token not in stop_words for token in types], dtype=bool)
+    columns = np.cumsum(is_keyword) - 1
+    vocabulary = [token for token, keep in zip(types, is_keyword) if keep]
+
+    keep = is_keyword[ids] if len(ids) else np.zeros(0, dtype=bool)
+    rows = np.repeat(np.arange(len(docs)), lengths)[keep]
+    cols = columns[ids[keep]]
+    # One entry per (document, keyword): its count and first position.
+    _, first, counts = np.unique(rows * max(len(vocabulary), 1) + cols, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")  # Positions grow with the row, so this is row-major.
+    indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(rows[first], minlength=len(docs)))
+    return CSRMatrix(indptr, cols[first[order]], counts[order], (len(docs), len(vocabulary))), vocabulary
+
+@instrumented("corpus.build_matrices")
+def build_matrices(texts, tokenizer=None):
+    """
+    Scans and tokenizes a batch of texts into a CorpusMatrices.
+
+    Keyword columns are numbered in order of first occurrence in the corpus,
+    and each row keeps its keywords in first-occurrence order, so ties rank
+    the same way as in `extract_keywords`.
+    """
+    lowered = [text.lower() for text in texts]
+    corpus = SEPARATOR.join(lowered)
+    if corpus.count(SEPARATOR) != max(len(lowered) - 1, 0):
+        # Another non-letter keeps such texts from being split in two.
+        lowered = [text.replace(SEPARATOR, "\x01") for text in lowered]
+        corpus = SEPARATOR.join(lowered)
+    lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered)) + 1
+    starts = [0] + np.cumsum(lengths).tolist()
+
+    phrases = _phrase_matrix(corpus, starts)
+    terms, vocabulary = _term_matrix(PUNCTUATION_RE.sub("", corpus).split(SEPARATOR) if lowered else [], tokenizer)
+    return CorpusMatrices(phrases, terms, vocabulary)
+
+def analyze_corpus(texts, tokenizer=None, k=5):
+    """
+    Analyzes a batch of texts with vectorized operations.
+
+    Returns:
+        A list with one {"sentiment", "keywords", "tags"} dictionary per text,
+        the same as calling `nlp_module.analyze_text` on each.
+    """
+    return build_matrices(texts, tokenizer).analyses(k)
@@ -0,0 +1,144 @@
+"""
+Lightweight per-stage timing for the assessment pipeline.
+
+Pipeline functions are wrapped with `@instrumented("stage.name")`, and
+blocks of code with `with timer("stage.name"):`. While instrumentation is
+disabled (the default) a wrapped call costs one extra function call and a
+flag check. Enable it with `enable()` or COACH_METRICS=1.
+
+Every timing goes into a per-stage latency histogram and is passed to any
+registered hooks, so it can be forwarded to another metrics system:
+
+    add_hook(lambda stage, seconds: statsd.timing(stage, seconds * 1000))
+
+`render_prometheus()` returns all histograms in the Prometheus text format.
+"""
+import functools
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+ENABLED = os.environ.get("COACH_METRICS") == "1"
+
+_lock = threading.Lock()
+_stages = {}
+_hooks = []
+
+class StageStats:
+    """The latency histogram of one stage."""
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+def enable():
+    """Starts recording timings."""
+    global ENABLED
+    ENABLED = True
+
+def disable():
+    """Stops recording timings. Already recorded data is kept."""
+    global ENABLED
+    ENABLED = False
+
+def reset():
+    """Discards all recorded timings."""
+    with _lock:
+        _stages.clear()
+
+def add_hook(hook):
+    """Registers `hook(stage, seconds)` to be called for every timing."""
+    _hooks.append(hook)
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+def record(stage, seconds):
+    """Records one timing for a stage."""
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.add(seconds)
+    for hook in _hooks:
+        hook(stage, seconds)
+
+def instrumented(stage):
+    """Decorator that times every call of a function as `stage`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+class timer:
+    """Context manager that times a block of code as `stage`."""
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        if ENABLED:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            record(self.stage, time.perf_counter() - self.start)
+        return False
+
+def snapshot():
+    """
+    Returns the recorded data as a dictionary mapping each stage to its
+    count, total and mean seconds, and cumulative histogram buckets.
+    """
+    with _lock:
+        result = {}
+        for stage, stats in sorted(_stages.items()):
+            cumulative, running = [], 0
+            for bound, count in zip(BUCKETS, stats.buckets):
+                running += count
+                cumulative.append((bound, running))
+            result[stage] = {
+                "count": stats.count,
+                "total_seconds": stats.total,
+                "mean_seconds": stats.total / stats.count if stats.count else 0.0,
+                "buckets": cumulative,
+            }
+        return result
+
+def render_prometheus(metric="coach_stage_duration_seconds"):
+    """Returns all stage histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {metric} Time spent in each pipeline stage.",
+        f"# TYPE {metric} histogram",
+    ]
+    for stage, data in snapshot().items():
+        for bound, count in data["buckets"]:
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {count}')
+        lines.append(f'{metric}_sum{{stage="{stage}"}} {data["total_seconds"]!r}')
+        lines.append(f'{metric}_count{{stage="{stage}"}} {data["count"]}')
+    return "\n".join(lines) + "\n"
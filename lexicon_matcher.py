@@ -0,0 +1,113 @@
+from collections import deque
+
+
+class LexiconMatcher:
+    """
+    An Aho-Corasick automaton compiled once from a set of labelled lexicons.
+
+    Matching keeps the semantics of the original `phrase in text` checks: a
+    phrase is found wherever it occurs as a substring, including inside longer
+    words and across spaces for multi-word phrases like "put off". A single
+    pass over the text finds every phrase, so the cost no longer grows with
+    the size of the lexicons.
+    """
+
+    def __init__(self, lexicons):
+        """
+        Args:
+            lexicons (dict): A dictionary mapping a label to a list of phrases.
+        """
+        self.phrases = []
+        self.phrase_labels = []
+        phrase_ids = {}
+        for label, phrases in lexicons.items():
+            for phrase in phrases:
+                if phrase not in phrase_ids:
+                    phrase_ids[phrase] = len(self.phrases)
+                    self.phrases.append(phrase)
+                    self.phrase_labels.append([])
+                # Keep duplicates so counts match a per-entry scan of the list.
+                self.phrase_labels[phrase_ids[phrase]].append(label)
+
+        self.labels = list(lexicons)
+        self.max_phrase_length = max((len(p) for p in self.phrases), default=0)
+        self._build(phrase_ids)
+
+    def _build(self, phrase_ids):
+        """Builds the goto, failure and output tables of the automaton."""
+        goto = [{}]
+        outputs = [[]]
+        for phrase, phrase_id in phrase_ids.items():
+            if not phrase:
+                continue  # The empty string is "in" every text.
+            state = 0
+            for char in phrase:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(phrase_id)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(out) for out in outputs]
+        self._always = frozenset(pid for phrase, pid in phrase_ids.items() if not phrase)
+
+    def feed(self, text, state=0, found=None):
+        """
+        Advances the automaton over `text`, starting from `state`.
+
+        This is the streaming primitive: passing the returned state back in
+        with the next chunk finds phrases that span chunk boundaries.
+
+        Returns:
+            A tuple of (state, found) where found is the set of phrase ids seen.
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        if found is None:
+            found = set(self._always)
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return state, found
+
+    def find(self, text):
+        """Returns the set of phrases that occur in `text`."""
+        _, found = self.feed(text)
+        return {self.phrases[pid] for pid in found}
+
+    def count_labels(self, found):
+        """
+        Counts matched lexicon entries per label for a set of phrase ids.
+
+        Returns:
+            A dictionary mapping every label to its number of matched entries.
+        """
+        counts = dict.fromkeys(self.labels, 0)
+        for pid in found:
+            for label in self.phrase_labels[pid]:
+                counts[label] += 1
+        return counts
+
+    def match(self, text):
+        """Makes one pass over `text` and returns the per-label match counts."""
+        _, found = self.feed(text)
+        return self.count_labels(found)
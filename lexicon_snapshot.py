@@ -0,0 +1,172 @@
+"""
+Builds and loads a compact binary snapshot of the NLP lexicons.
+
+The snapshot holds the stopword list, the sentiment lexicons and the
+behavioral tag map in one versioned file. Workers load it with mmap, so they
+never import NLTK or read its data directory just to get the stopwords.
+
+Build it once (NLTK and its stopwords data must be installed for this step):
+
+    python lexicon_snapshot.py build --out lexicon.snap
+
+Then point the analyzer at it:
+
+    NLP_LEXICON_SNAPSHOT=lexicon.snap streamlit run app.py
+
+File layout (all integers little-endian):
+    header:   magic b"LEXSNAP\\0", format version (u32), section count (u32)
+    sections: name (16 bytes, NUL-padded), offset (u64), length (u64)
+    payloads: UTF-8 text, one entry per line ("tag\\tphrase" for the tag map)
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"LEXSNAP\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+SECTION = struct.Struct("<16sQQ")
+
+def lexicon_fingerprint(stop_words, positive_words, negative_words, tag_map):
+    """Returns a short hash identifying the exact lexicon contents."""
+    content = json.dumps(
+        [sorted(stop_words), list(positive_words), list(negative_words), tag_map],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+def build_snapshot(path, stop_words, positive_words, negative_words, tag_map):
+    """
+    Writes the lexicons to a snapshot file.
+
+    Returns:
+        The fingerprint of the lexicons that were written.
+    """
+    fingerprint = lexicon_fingerprint(stop_words, positive_words, negative_words, tag_map)
+    sections = {
+        "meta": f"{FORMAT_VERSION}\n{fingerprint}",
+        "stopwords": "\n".join(sorted(stop_words)),
+        "positive": "\n".join(positive_words),
+        "negative": "\n".join(negative_words),
+        "tags": "\n".join(f"{tag}\t{phrase}" for tag, phrases in tag_map.items() for phrase in phrases),
+    }
+    payloads = [(name.encode("ascii"), text.encode("utf-8")) for name, text in sections.items()]
+
+    offset = HEADER.size + SECTION.size * len(payloads)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(payloads)))
+        for name, data in payloads:
+            f.write(SECTION.pack(name, offset, len(data)))
+            offset += len(data)
+        for _, data in payloads:
+            f.write(data)
+    os.replace(path + ".tmp", path)  # Readers never see a half-written file.
+    return fingerprint
+
+def _split_lines(text):
+    """Splits a section payload into entries."""
+    return text.split("\n") if text else []
+
+class LexiconSnapshot:
+    """A read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a lexicon snapshot.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}. Rebuild it.")
+
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._mm, HEADER.size + i * SECTION.size)
+            self._sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+        self.fingerprint = self._read("meta").split("\n")[1]
+
+    def _read(self, name):
+        """Decodes one section from the mapped file."""
+        offset, length = self._sections[name]
+        return self._mm[offset:offset + length].decode("utf-8")
+
+    def stop_words(self):
+        return frozenset(_split_lines(self._read("stopwords")))
+
+    def positive_words(self):
+        return _split_lines(self._read("positive"))
+
+    def negative_words(self):
+        return _split_lines(self._read("negative"))
+
+    def tag_map(self):
+        tag_map = {}
+        for line in _split_lines(self._read("tags")):
+            tag, phrase = line.split("\t", 1)
+            tag_map.setdefault(tag, []).append(phrase)
+        return tag_map
+
+def _cold_start_time(env):
+    """Times importing nlp_module and analyzing one answer in a fresh interpreter."""
+    import subprocess
+    code = (
+        "import time; t = time.perf_counter(); import nlp_module; "
+        "nlp_module.analyze_descriptive_answers({'q': 'I put off my work and feel tired.'}); "
+        "print(time.perf_counter() - t)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", code], env=env, cwd=here, capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+def measure(snapshot_path, runs=5):
+    """Prints the median cold-start time with and without the snapshot."""
+    base_env = {k: v for k, v in os.environ.items() if k != "NLP_LEXICON_SNAPSHOT"}
+    base_env["NLP_TOKENIZER"] = "regex"
+    snap_env = dict(base_env, NLP_LEXICON_SNAPSHOT=os.path.abspath(snapshot_path))
+    for label, env in (("NLTK stopwords", base_env), ("snapshot", snap_env)):
+        times = sorted(_cold_start_time(env) for _ in range(runs))
+        print(f"{label:>15}: import + first request {times[len(times) // 2] * 1000:.1f} ms (median of {runs})")
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or benchmark the lexicon snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Compile the lexicons into a snapshot file.")
+    build.add_argument("--out", default="lexicon.snap")
+    build.add_argument("--lexicons", help="JSON file with 'positive', 'negative' and 'tags' keys to use instead of the defaults in nlp_module.")
+    build.add_argument("--stopwords-file", help="A file with one stopword per line to use instead of NLTK's English list.")
+    bench = sub.add_parser("measure", help="Compare cold-start time with and without a snapshot.")
+    bench.add_argument("snapshot", nargs="?", default="lexicon.snap")
+    bench.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "measure":
+        measure(args.snapshot, args.runs)
+        return
+
+    os.environ.pop("NLP_LEXICON_SNAPSHOT", None)  # Always build from the source lexicons.
+    import nlp_module
+
+    if args.stopwords_file:
+        with open(args.stopwords_file, encoding="utf-8") as f:
+            stop_words = {line.strip() for line in f if line.strip()}
+    else:
+        stop_words = nlp_module.get_stop_words()
+
+    positive, negative, tags = nlp_module.POSITIVE_WORDS, nlp_module.NEGATIVE_WORDS, nlp_module.BEHAVIORAL_TAG_MAP
+    if args.lexicons:
+        with open(args.lexicons, encoding="utf-8") as f:
+            lexicons = json.load(f)
+        positive, negative, tags = lexicons["positive"], lexicons["negative"], lexicons["tags"]
+
+    fingerprint = build_snapshot(args.out, stop_words, positive, negative, tags)
+    print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes, fingerprint {fingerprint}).")
+
+if __name__ == "__main__":
+    main()
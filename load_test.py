@@ -0,0 +1,162 @@
+"""
+Headless load harness for the Streamlit app.
+
+Drives simulated users through the full MCQ -> descriptive -> results flow
+using Streamlit's AppTest, then reports turn latency percentiles and the
+memory held per session. No browser or server is needed:
+
+    python load_test.py --users 50 --processes 4
+
+AppTest sessions cannot run on several threads of one process at once, so
+each process keeps all of its sessions alive and advances them one turn at a
+time in round-robin order, the way a server interleaves active users. Use
+several processes to put concurrent CPU load on the machine.
+
+Pacing is turned off by default (COACH_PACING=off) so the numbers measure the
+app itself; pass --pacing sleep to include the "Thinking..." delay. The app's
+default timer pacing cannot be used here, since AppTest does not run the
+timer that reruns the app when the pause is over.
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mcq_module import QUESTIONS
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+SAMPLE_ANSWERS = [
+    "I put off hard tasks and my phone keeps distracting me with notifications.",
+    "Deadlines make me rushed and I always feel the pressure of no time.",
+    "I feel exhausted and drained by the end of the day, with no energy left.",
+    "I plan my day with a list and a morning routine, which keeps me focused.",
+    "Social media is my biggest distraction when I can't start a task.",
+    "Late mornings when I am calm and ready to work.",
+]
+
+def current_rss_kb():
+    """Returns the resident set size of this process in kB (Linux only, else 0)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def user_turns(seed):
+    """Returns the chat inputs one simulated user types, in order."""
+    rng = random.Random(seed)
+    turns = ["start"]
+    turns += [str(rng.randint(1, 4)) for _ in QUESTIONS]
+    turns += [rng.choice(SAMPLE_ANSWERS), rng.choice(SAMPLE_ANSWERS)]
+    return turns
+
+def timed_run(at):
+    """Runs one script turn and returns its latency in seconds."""
+    start = time.perf_counter()
+    at.run()
+    return time.perf_counter() - start
+
+def session_state_bytes(at):
+    """Approximates one session's state size by pickling its values."""
+    state = {key: at.session_state[key] for key in ("messages", "mcq_answers", "desc_answers", "desc_partials")}
+    return len(pickle.dumps(state))
+
+def run_sessions(seeds, pacing, timeout):
+    """
+    Runs a group of simulated users in this process, all alive at once.
+
+    Returns:
+        A dictionary with the turn latencies, RSS growth in kB and session state sizes.
+    """
+    os.environ["COACH_PACING"] = pacing
+    from streamlit.testing.v1 import AppTest
+
+    # Warm up once so imports and shared resources don't count against the sessions.
+    warm_up = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    for text in user_turns(-1):
+        warm_up.chat_input[0].set_value(text).run()
+    del warm_up
+
+    rss_before = current_rss_kb()
+    latencies = []
+    sessions = []
+    for seed in seeds:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        latencies.append(timed_run(at))
+        sessions.append((seed, at, user_turns(seed)))
+
+    for turn in range(len(sessions[0][2]) if sessions else 0):
+        for seed, at, turns in sessions:
+            at.chat_input[0].set_value(turns[turn])
+            latencies.append(timed_run(at))
+
+    for seed, at, _ in sessions:
+        if at.exception or at.session_state.stage != "finished":
+            raise RuntimeError(f"Simulated user {seed} did not finish: {at.exception}")
+
+    # The finished sessions are still alive here, so the RSS growth is what they hold.
+    return {
+        "latencies": latencies,
+        "rss_kb": current_rss_kb() - rss_before,
+        "state_sizes": [session_state_bytes(at) for _, at, _ in sessions],
+    }
+
+def run_load_test(users, processes, pacing, timeout=60):
+    """Spreads the simulated users over worker processes and returns a dictionary of results."""
+    groups = [list(range(i, users, processes)) for i in range(processes)]
+    started = time.perf_counter()
+    if processes == 1:
+        runs = [run_sessions(groups[0], pacing, timeout)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            runs = list(executor.map(run_sessions, groups, [pacing] * processes, [timeout] * processes))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for run in runs for latency in run["latencies"]]
+    state_sizes = [size for run in runs for size in run["state_sizes"]]
+    return {
+        "users": users,
+        "processes": processes,
+        "pacing": pacing,
+        "turns": len(latencies),
+        "elapsed_s": elapsed,
+        "turn_p50_ms": percentile(latencies, 50) * 1000,
+        "turn_p99_ms": percentile(latencies, 99) * 1000,
+        "turn_max_ms": max(latencies) * 1000,
+        "rss_per_session_kb": sum(run["rss_kb"] for run in runs) / users,
+        "state_per_session_bytes": sum(state_sizes) / users,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with simulated users.")
+    parser.add_argument("--users", type=int, default=20, help="Number of simulated sessions.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to spread the sessions over.")
+    parser.add_argument("--pacing", choices=["off", "sleep"], default="off", help="COACH_PACING mode for the app.")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-turn timeout in seconds.")
+    args = parser.parse_args(argv)
+
+    if args.users < 1 or args.processes < 1 or args.processes > args.users:
+        parser.error("need at least one user per process")
+
+    results = run_load_test(args.users, args.processes, args.pacing, args.timeout)
+    print(f"{results['users']} concurrent sessions over {results['processes']} process(es), pacing={results['pacing']}")
+    print(f"  turns:            {results['turns']} in {results['elapsed_s']:.1f} s")
+    print(f"  turn latency:     p50 {results['turn_p50_ms']:.1f} ms, p99 {results['turn_p99_ms']:.1f} ms, max {results['turn_max_ms']:.1f} ms")
+    print(f"  RSS per session:  {results['rss_per_session_kb']:.0f} kB")
+    print(f"  session state:    {results['state_per_session_bytes']:.0f} bytes")
+
+if __name__ == "__main__":
+    sys.exit(main())
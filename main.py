@@ -1,32 +1,145 @@
+import argparse
 import json
-from mcq_module import run_mcq_test, get_productivity_profile
+import sys
+import instrumentation
+from aggregates import CohortSummary
+from instrumentation import instrumented
+from mcq_module import run_mcq_test, score_mcq_choices, get_productivity_profile
 from nlp_module import analyze_descriptive_answers
 from recommendation_module import get_recommendations
+# generate_summary used to live here and is still importable from main.
+from report_module import generate_summary, get_fragments, render_json, render_text
+from result_types import AssessmentResult
+from results_store import ResultsStore
 
-def generate_summary(profile, tags):
-    """Generates a 2-3 line personalized summary."""
-    summary = f"Your results show you're in the '{profile}' category. "
-    
-    if not tags:
-        summary += "You seem to have a good handle on your productivity habits."
-        return summary
-
-    if "procrastination" in tags and "distraction" in tags:
-        summary += "It seems like procrastination and frequent distractions are key challenges for you. "
-    elif "burnout" in tags or "time anxiety" in tags:
-        summary += "We've noticed signs of potential burnout and pressure related to time management. "
-    else:
-        summary += f"You appear to be struggling with {tags[0]}. "
-        
-    summary += "Let's find some steps to help you improve."
-    return summary
+@instrumented("main.run_assessment")
+def run_assessment(mcq_score, mcq_answers, descriptive_answers):
+    """
+    Runs profiling, NLP analysis, summary and recommendations for one respondent.
 
-def main():
-    """Main function to run the entire assessment flow."""
+    Returns:
+        A dictionary in the same shape as `output_data.json`.
+    """
+    productivity_profile = get_productivity_profile(mcq_score)
+
+    nlp_analysis = analyze_descriptive_answers(descriptive_answers)
+    behavioral_tags = nlp_analysis['all_tags']
+
+    final_summary = get_fragments(productivity_profile, behavioral_tags).summary
+    recommendations = get_recommendations(productivity_profile, behavioral_tags)
+
+    return {
+        "user_input": {
+            "mcq_answers": mcq_answers,
+            "descriptive_answers": descriptive_answers
+        },
+        "system_output": {
+            "mcq_score": mcq_score,
+            "profile": productivity_profile,
+            "nlp_analysis": nlp_analysis,
+            "summary": final_summary,
+            "recommendations": recommendations
+        }
+    }
+
+@instrumented("main.process_submission")
+def process_submission(submission):
+    """
+    Scores a submission without any user interaction.
+
+    Args:
+        submission (dict): A dictionary with "mcq_choices" (the 1-based option
+            number for each question) and "descriptive_answers" (a dictionary of
+            answers). An optional "id" is copied to the result.
+
+    Returns:
+        A dictionary in the same shape as `output_data.json`.
+    """
+    mcq_score, mcq_answers = score_mcq_choices(submission["mcq_choices"])
+    output_data = run_assessment(mcq_score, mcq_answers, submission["descriptive_answers"])
+    if "id" in submission:
+        output_data = {"id": submission["id"], **output_data}
+    return output_data
+
+def score_line(line, line_number, store_writer=None, summary=None):
+    """
+    Scores one JSONL submission line for the batch mode.
+
+    Returns:
+        A tuple of (result, ok). When the line cannot be processed, `result`
+        is an {"line": ..., "error": ...} record and `ok` is False.
+    """
+    try:
+        if store_writer is None:
+            result = process_submission(json.loads(line))
+        else:
+            compact = AssessmentResult.from_submission(json.loads(line))
+            store_writer.append(compact)
+            result = compact.to_dict()
+        if summary is not None:
+            summary.add(result)
+        return result, True
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return {"line": line_number, "error": f"{type(e).__name__}: {e}"}, False
+
+def run_batch(in_file, out_file, store_writer=None, summary=None):
+    """
+    Streams JSONL submissions from `in_file` and writes one JSON result per line.
+
+    Only one line is held in memory at a time. Lines that cannot be processed
+    produce an {"line": ..., "error": ...} record instead of stopping the run.
+    With a `store_writer` (see results_store.ResultsStore.writer), results are
+    also appended to a columnar results store, and with a `summary` (see
+    aggregates.CohortSummary) they are added to it.
+
+    Returns:
+        A tuple of (processed, failed) line counts.
+    """
+    processed = failed = 0
+    for line_number, line in enumerate(in_file, start=1):
+        if not line.strip():
+            continue
+        result, ok = score_line(line, line_number, store_writer, summary)
+        if ok:
+            processed += 1
+        else:
+            failed += 1
+        out_file.write(render_json(result))
+        out_file.write("\n")
+    out_file.flush()
+    return processed, failed
+
+def open_stream(path, mode):
+    """Opens a file for the batch mode, where "-" means stdin or stdout."""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8")
+
+def run_batch_files(in_path, out_path, store_path=None, summary_path=None):
+    """Runs the batch mode between two paths, where "-" means stdin or stdout."""
+    in_file = open_stream(in_path, "r")
+    out_file = open_stream(out_path, "w")
+    store_writer = ResultsStore(store_path).writer() if store_path else None
+    summary = CohortSummary() if summary_path else None
+    try:
+        processed, failed = run_batch(in_file, out_file, store_writer, summary)
+    finally:
+        if store_writer is not None:
+            store_writer.close()
+        if summary is not None:
+            with open(summary_path, "w", encoding="utf-8") as f:
+                json.dump(summary.to_dict(), f, separators=(",", ":"))
+        if in_file is not sys.stdin:
+            in_file.close()
+        if out_file is not sys.stdout:
+            out_file.close()
+    print(f"Processed {processed} submissions ({failed} failed).", file=sys.stderr)
+
+def run_interactive():
+    """Runs the interactive assessment in the terminal."""
     
     # --- Part 1: MCQ Test ---
     mcq_score, mcq_answers = run_mcq_test()
-    productivity_profile = get_productivity_profile(mcq_score)
     
     # --- Part 2: Descriptive NLP Analysis ---
     print("\n--- Part 2: Descriptive Questions ---\n")
@@ -41,56 +154,41 @@ def main():
         "focus_time": answer2
     }
     
-    nlp_analysis = analyze_descriptive_answers(descriptive_answers)
-    behavioral_tags = nlp_analysis['all_tags']
-    
-    # --- Part 3: Result Generation ---
-    final_summary = generate_summary(productivity_profile, behavioral_tags)
-    
-    # --- Part 4: Recommendation Flow ---
-    recommendations = get_recommendations(productivity_profile, behavioral_tags)
+    # --- Part 3 & 4: Result Generation and Recommendation Flow ---
+    output_data = run_assessment(mcq_score, mcq_answers, descriptive_answers)
 
     # --- Final Output ---
-    print("\n\n======================================")
-    print("      Your Personalized Analysis      ")
-    print("======================================\n")
-    
-    print(f"👤 PRODUCTIVITY PROFILE: {productivity_profile}\n")
-    
-    print("📝 SUMMARY:")
-    print(f"   {final_summary}\n")
-    
-    print("💡 RECOMMENDED ACTIONS:\n")
-    if recommendations["Basic (Free)"]:
-        print("--- Basic (Free) ---")
-        for rec in recommendations["Basic (Free)"]:
-            print(f"  • {rec}")
-    
-    if recommendations["Premium (Advanced)"]:
-        print("\n--- Premium (Advanced) ---")
-        for rec in recommendations["Premium (Advanced)"]:
-            print(f"  • {rec}")
+    print(render_text(output_data))
             
     # --- Create JSON output for submission ---
-    output_data = {
-        "user_input": {
-            "mcq_answers": mcq_answers,
-            "descriptive_answers": descriptive_answers
-        },
-        "system_output": {
-            "mcq_score": mcq_score,
-            "profile": productivity_profile,
-            "nlp_analysis": nlp_analysis,
-            "summary": final_summary,
-            "recommendations": recommendations
-        }
-    }
-    
-    with open("output_data.json", "w") as f:
-        json.dump(output_data, f, indent=4)
+    with open("output_data.json", "w", encoding="utf-8") as f:
+        # Escaped like the json.dump this replaced, so the file is byte-for-byte the same.
+        f.write(render_json(output_data, indent=4, ensure_ascii=True))
         
     print("\n\n(A file named 'output_data.json' with your detailed results has been saved.)")
 
+def main(argv=None):
+    """Main function to run the entire assessment flow."""
+    parser = argparse.ArgumentParser(description="Productivity coach assessment.")
+    parser.add_argument("--batch", metavar="IN", help="Score submissions from a JSONL file without prompting ('-' for stdin).")
+    parser.add_argument("--out", metavar="OUT", default="-", help="Where to write JSONL results in batch mode ('-' for stdout).")
+    parser.add_argument("--store", metavar="DIR", help="Also append batch results to a columnar results store in DIR.")
+    parser.add_argument("--summary", metavar="PATH", help="Write a mergeable cohort summary of the batch to PATH (see aggregates.py).")
+    parser.add_argument("--metrics", metavar="PATH", help="Record per-stage timings and write them to PATH in Prometheus text format.")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        instrumentation.enable()
+
+    if args.batch is None:
+        run_interactive()
+    else:
+        run_batch_files(args.batch, args.out, args.store, args.summary)
+
+    if args.metrics:
+        with open(args.metrics, "w") as f:
+            f.write(instrumentation.render_prometheus())
+
 
 if __name__ == "__main__":
     try:
@@ -1,3 +1,5 @@
+from instrumentation import instrumented
+
 # A list of dictionaries, each representing a question.
 QUESTIONS = [
     {
@@ -46,6 +48,42 @@ QUESTIONS = [
     },
 ]
 
+def score_choice(question, choice):
+    """
+    Scores a single answer, where `choice` is the 1-based option number.
+    Scoring: 0 for best, 3 for worst.
+    """
+    # Some questions are reversed, where "Almost Always" is a good thing.
+    score = choice - 1
+    if question.get("reversed"):
+        score = 3 - score
+    return score
+
+@instrumented("mcq.score_mcq_choices")
+def score_mcq_choices(choices):
+    """
+    Scores a full set of answers without prompting the user.
+
+    Args:
+        choices (list): The 1-based option number chosen for each question, in order.
+
+    Returns:
+        The total score and a dictionary of answers in the same shape as `run_mcq_test`.
+    """
+    if len(choices) != len(QUESTIONS):
+        raise ValueError(f"Expected {len(QUESTIONS)} MCQ choices, got {len(choices)}.")
+
+    total_score = 0
+    user_mcq_answers = {}
+    for i, (q, choice) in enumerate(zip(QUESTIONS, choices)):
+        if not isinstance(choice, int) or not 1 <= choice <= 4:
+            raise ValueError(f"Invalid choice for Q{i+1}: {choice!r}. Expected a number between 1 and 4.")
+        score = score_choice(q, choice)
+        total_score += score
+        user_mcq_answers[f"Q{i+1}"] = {"answer": q['options'][choice-1], "score": score}
+
+    return total_score, user_mcq_answers
+
 def run_mcq_test():
     """
     Presents the MCQ test to the user and calculates the total score.
@@ -70,12 +108,7 @@ def run_mcq_test():
             except ValueError:
                 print("Invalid input. Please enter a number.")
 
-        # Scoring: 0 for best, 3 for worst.
-        # Some questions are reversed, where "Almost Always" is a good thing.
-        score = choice - 1
-        if q.get("reversed"):
-            score = 3 - score
-        
+        score = score_choice(q, choice)
         total_score += score
         user_mcq_answers[f"Q{i+1}"] = {"answer": q['options'][choice-1], "score": score}
         print("-" * 20)
@@ -83,16 +116,24 @@ def run_mcq_test():
     return total_score, user_mcq_answers
 
 
+# Profiles in order of increasing score.
+PROFILES = ["Focused Achiever", "Moderately Distracted", "Burnout Risk"]
+
+def get_profile_thresholds(num_questions=len(QUESTIONS)):
+    """
+    Returns the upper score bound (inclusive) of every profile except the last.
+    The max score is num_questions * 3.
+    """
+    max_score = num_questions * 3
+    return [max_score / 3, (max_score / 3) * 2]
+
+@instrumented("mcq.get_productivity_profile")
 def get_productivity_profile(score, num_questions=len(QUESTIONS)):
     """
     Categorizes the user into a productivity profile based on their score.
     The max score is num_questions * 3.
     """
-    max_score = num_questions * 3
-    
-    if score <= max_score / 3:
-        return "Focused Achiever"
-    elif score <= (max_score / 3) * 2:
-        return "Moderately Distracted"
-    else:
-        return "Burnout Risk"
\ No newline at end of file
+    for profile, threshold in zip(PROFILES, get_profile_thresholds(num_questions)):
+        if score <= threshold:
+            return profile
+    return PROFILES[-1]
\ No newline at end of file
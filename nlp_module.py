@@ -1,9 +1,14 @@
+import os
 import re
 import string
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from collections import Counter, deque
+from functools import lru_cache
+from itertools import islice
+from analysis_cache import AnalysisCache, make_key
+from instrumentation import instrumented, timer
+from lexicon_matcher import LexiconMatcher
+from lexicon_snapshot import LexiconSnapshot, lexicon_fingerprint
+from sketches import SpaceSaving
 
 # --- Keyword Dictionaries ---
 
@@ -25,12 +30,47 @@ BEHAVIORAL_TAG_MAP = {
     "planning": ["plan", "schedule", "list", "organize", "morning routine"]
 }
 
-def analyze_sentiment(text):
-    """A simple keyword-based sentiment analysis."""
-    text_lower = text.lower()
-    pos_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
-    neg_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+# --- Lexicon Snapshot ---
+# Set NLP_LEXICON_SNAPSHOT to a file built with `python lexicon_snapshot.py build`
+# to load the lexicons and stopwords from it instead of the lists above and NLTK.
+LEXICON_SNAPSHOT = None
+if os.environ.get("NLP_LEXICON_SNAPSHOT"):
+    LEXICON_SNAPSHOT = LexiconSnapshot(os.environ["NLP_LEXICON_SNAPSHOT"])
+    POSITIVE_WORDS = LEXICON_SNAPSHOT.positive_words()
+    NEGATIVE_WORDS = LEXICON_SNAPSHOT.negative_words()
+    BEHAVIORAL_TAG_MAP = LEXICON_SNAPSHOT.tag_map()
+
+# All lexicons are compiled into one matcher at import time, so each text is
+# scanned once no matter how many lexicon entries there are.
+LEXICON_MATCHER = LexiconMatcher({
+    ("sentiment", "positive"): POSITIVE_WORDS,
+    ("sentiment", "negative"): NEGATIVE_WORDS,
+    **{("tag", tag): keywords for tag, keywords in BEHAVIORAL_TAG_MAP.items()},
+})
+
+def summarize_matches(found):
+    """
+    Turns the phrase ids found by LEXICON_MATCHER into sentiment counts and tags.
+
+    Returns:
+        A dictionary with the positive and negative word counts and the list of
+        behavioral tags whose keywords appear in the text.
+    """
+    counts = LEXICON_MATCHER.count_labels(found)
+    return {
+        "positive": counts[("sentiment", "positive")],
+        "negative": counts[("sentiment", "negative")],
+        "tags": [tag for tag in BEHAVIORAL_TAG_MAP if counts[("tag", tag)]],
+    }
+
+@instrumented("nlp.match_lexicons")
+def match_lexicons(text):
+    """Scans the text once for every lexicon entry. See `summarize_matches` for the result."""
+    _, found = LEXICON_MATCHER.feed(text.lower())
+    return summarize_matches(found)
 
+def sentiment_from_counts(pos_count, neg_count):
+    """Turns positive and negative word counts into a sentiment label."""
     if neg_count > pos_count:
         return "Negative"
     elif pos_count > neg_count:
@@ -38,49 +78,454 @@ def analyze_sentiment(text):
     else:
         return "Neutral"
 
-def extract_keywords(text):
-    """Extracts significant keywords by removing stopwords and punctuation."""
-    stop_words = set(stopwords.words('english'))
+@instrumented("nlp.analyze_sentiment")
+def analyze_sentiment(text):
+    """A simple keyword-based sentiment analysis."""
+    matches = match_lexicons(text)
+    return sentiment_from_counts(matches["positive"], matches["negative"])
+
+@lru_cache(maxsize=None)
+@instrumented("nlp.load_stop_words")
+def get_stop_words():
+    """Loads the English stopwords once per process, from the snapshot if one is set."""
+    if LEXICON_SNAPSHOT is not None:
+        return LEXICON_SNAPSHOT.stop_words()
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+# --- Tokenizer Backends ---
+
+PUNCTUATION_RE = re.compile(f"[{re.escape(string.punctuation)}]")
+
+def nltk_tokenize(text):
+    """Tokenizes with NLTK's `word_tokenize`. NLTK is imported on first use."""
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
+
+def regex_tokenize(text):
+    """
+    A fast tokenizer that splits on whitespace.
+
+    Text reaching a tokenizer is already lowercased and stripped of ASCII
+    punctuation, and only alphabetic tokens are kept as keywords, so this gives
+    the same keywords as `nltk_tokenize` for almost all answers. Known
+    differences:
+      - NLTK splits some contractions written without an apostrophe, e.g.
+        "cannot" -> "can", "not" and "gonna" -> "gon", "na". Here they stay one
+        word ("can" and "not" are stopwords, so NLTK drops them).
+      - NLTK splits off some non-ASCII punctuation such as curly quotes and
+        em dashes, so the words around them are kept. Here the punctuation
+        stays attached and the token is dropped by the alphabetic filter.
+    """
+    return text.split()
+
+TOKENIZERS = {
+    "nltk": nltk_tokenize,
+    "regex": regex_tokenize,
+}
+
+# The backend used when none is given per call, e.g. NLP_TOKENIZER=regex.
+DEFAULT_TOKENIZER = os.environ.get("NLP_TOKENIZER", "nltk")
+
+def get_tokenizer(tokenizer=None):
+    """Returns the tokenizer function for a backend name (default: DEFAULT_TOKENIZER)."""
+    name = tokenizer or DEFAULT_TOKENIZER
+    try:
+        return TOKENIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown tokenizer '{name}'. Choose one of: {', '.join(TOKENIZERS)}.") from None
+
+def count_keywords(text, tokenizer=None):
+    """Counts significant keywords after removing stopwords and punctuation."""
+    tokenize = get_tokenizer(tokenizer)
+    stop_words = get_stop_words()
     text = text.lower()
-    text = re.sub(f"[{re.escape(string.punctuation)}]", "", text) # Remove punctuation
-    tokens = word_tokenize(text)
+    text = PUNCTUATION_RE.sub("", text) # Remove punctuation
+    with timer("nlp.tokenize"):
+        tokens = tokenize(text)
     
-    keywords = [word for word in tokens if word.isalpha() and word not in stop_words]
+    return Counter(word for word in tokens if word.isalpha() and word not in stop_words)
+
+@instrumented("nlp.extract_keywords")
+def extract_keywords(text, tokenizer=None):
+    """Extracts significant keywords by removing stopwords and punctuation."""
     # Return the 5 most common keywords
-    return [word for word, count in Counter(keywords).most_common(5)]
+    return [word for word, count in count_keywords(text, tokenizer).most_common(5)]
 
+@instrumented("nlp.get_behavioral_tags")
 def get_behavioral_tags(text):
     """Assigns behavioral tags based on keyword matches."""
-    text_lower = text.lower()
-    tags = set() # Use a set to avoid duplicate tags
-    for tag, keywords in BEHAVIORAL_TAG_MAP.items():
-        if any(keyword in text_lower for keyword in keywords):
-            tags.add(tag)
-    return list(tags)
+    return match_lexicons(text)["tags"]
 
-def analyze_descriptive_answers(answers_dict):
+# --- Mergeable Partial Analysis ---
+
+class PartialAnalysis:
+    """
+    The analysis of one piece of text, in a form that can be merged.
+
+    Merging partials gives exactly the result of analyzing their texts joined
+    with spaces, without tokenizing or scanning them again. Merging is
+    associative, so answers can be analyzed one at a time as they arrive and
+    combined at the end.
+
+    Attributes:
+        found (frozenset): Ids of the LEXICON_MATCHER phrases found in the text.
+        keyword_counts (Counter): Keyword counts, in order of first occurrence.
+        head (str), tail (str): The first and last few characters of the
+            lowercased text, enough to find phrases that span a join.
+    """
+    __slots__ = ("found", "keyword_counts", "head", "tail")
+
+    # A phrase spanning a join has at most this many characters on each side.
+    EDGE = max(LEXICON_MATCHER.max_phrase_length - 1, 0)
+
+    def __init__(self, found, keyword_counts, head, tail):
+        self.found = found
+        self.keyword_counts = keyword_counts
+        self.head = head
+        self.tail = tail
+
+    @classmethod
+    def from_text(cls, text, tokenizer=None):
+        """Analyzes a text from scratch."""
+        text_lower = text.lower()
+        with timer("nlp.match_lexicons"):
+            _, found = LEXICON_MATCHER.feed(text_lower)
+        edge = cls.EDGE
+        return cls(
+            frozenset(found),
+            count_keywords(text, tokenizer),
+            text_lower[:edge],
+            text_lower[-edge:] if edge else "",
+        )
+
+    def merge(self, other):
+        """Returns the analysis of this text and `other` joined with a space."""
+        edge = self.EDGE
+        found = set(self.found)
+        found.update(other.found)
+        if edge:
+            # Only phrases crossing the join are new; everything else is already in `found`.
+            LEXICON_MATCHER.feed(f"{self.tail} {other.head}", found=found)
+
+        keyword_counts = Counter(self.keyword_counts)
+        keyword_counts.update(other.keyword_counts)
+        return PartialAnalysis(
+            frozenset(found),
+            keyword_counts,
+            f"{self.head} {other.head}"[:edge],
+            f"{self.tail} {other.tail}"[-edge:] if edge else "",
+        )
+
+    def to_analysis(self):
+        """Returns the sentiment, top 5 keywords and tags of the text."""
+        matches = summarize_matches(self.found)
+        return {
+            "sentiment": sentiment_from_counts(matches["positive"], matches["negative"]),
+            "keywords": [word for word, count in self.keyword_counts.most_common(5)],
+            "tags": matches["tags"],
+        }
+
+    def to_dict(self):
+        """Returns a JSON-serializable form of the partial."""
+        return {
+            "found": sorted(self.found),
+            "keywords": list(self.keyword_counts.items()),
+            "head": self.head,
+            "tail": self.tail,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(frozenset(data["found"]), Counter(dict(data["keywords"])), data["head"], data["tail"])
+
+@instrumented("nlp.merge_partials")
+def merge_partials(partials):
+    """Merges partial analyses in order, as if their texts were joined with spaces."""
+    merged = None
+    for partial in partials:
+        merged = partial if merged is None else merged.merge(partial)
+    return merged if merged is not None else PartialAnalysis.from_text("")
+
+# --- Analysis Cache ---
+
+# Bump when a change to the analysis code would alter cached results.
+ANALYSIS_VERSION = 3
+
+# Set by enable_cache(), or at import from NLP_CACHE_SIZE / NLP_CACHE_DB.
+ANALYSIS_CACHE = None
+
+@lru_cache(maxsize=None)
+def get_lexicon_fingerprint():
+    """Returns a hash of the stopwords and lexicons in use."""
+    if LEXICON_SNAPSHOT is not None:
+        return LEXICON_SNAPSHOT.fingerprint
+    return lexicon_fingerprint(get_stop_words(), POSITIVE_WORDS, NEGATIVE_WORDS, BEHAVIORAL_TAG_MAP)
+
+def get_lexicon_version():
+    """Identifies the analysis code and lexicons, which every cached analysis depends on."""
+    return f"{ANALYSIS_VERSION}:{get_lexicon_fingerprint()}"
+
+def get_analysis_fingerprint(tokenizer=None):
+    """Identifies everything a cached analysis depends on besides the text itself."""
+    return f"{get_lexicon_version()}:{tokenizer or DEFAULT_TOKENIZER}"
+
+def enable_cache(maxsize=10000, sqlite_path=None):
+    """
+    Caches per-text analysis results for all following calls.
+
+    Args:
+        maxsize (int): Maximum number of results kept in memory.
+        sqlite_path (str): Optional SQLite file shared by all processes on the host.
+
+    Returns:
+        The AnalysisCache, whose stats() reports hits, misses and evictions.
+    """
+    global ANALYSIS_CACHE
+    cache = AnalysisCache(maxsize, sqlite_path)
+    # On-disk entries from older lexicons can never be hit again, so drop them.
+    # Entries are tagged without the tokenizer, which is chosen per call and
+    # per worker, so workers never purge each other's valid entries.
+    cache.purge_stale(get_lexicon_version())
+    ANALYSIS_CACHE = cache
+    return cache
+
+def disable_cache():
+    """Turns the analysis cache off."""
+    global ANALYSIS_CACHE
+    ANALYSIS_CACHE = None
+
+@instrumented("nlp.analyze_partial")
+def analyze_partial(text, tokenizer=None):
+    """
+    Analyzes a single text into a PartialAnalysis, using the cache if enabled.
+    The result is shared with the cache and must not be modified.
+    """
+    cache = ANALYSIS_CACHE
+    if cache is None:
+        return PartialAnalysis.from_text(text, tokenizer)
+
+    fingerprint = get_analysis_fingerprint(tokenizer)
+    key = make_key(text, fingerprint)
+    cached = cache.get(key)
+    if cached is not None:
+        return PartialAnalysis.from_dict(cached)
+
+    partial = PartialAnalysis.from_text(text, tokenizer)
+    cache.put(key, partial.to_dict(), get_lexicon_version())
+    return partial
+
+def analyze_text(text, tokenizer=None):
+    """
+    Runs sentiment, keyword and tag analysis on a single text, using the cache if enabled.
+
+    Returns:
+        A dictionary with the "sentiment", "keywords" and "tags" of the text.
+    """
+    return analyze_partial(text, tokenizer).to_analysis()
+
+@instrumented("nlp.analyze_descriptive_answers")
+def analyze_descriptive_answers(answers_dict, tokenizer=None, partials=None):
     """
     Runs full NLP analysis on a dictionary of descriptive answers.
     
     Args:
         answers_dict (dict): A dictionary where keys are questions and values are user answers.
+        tokenizer (str): The tokenizer backend for keyword extraction (see TOKENIZERS).
+        partials (dict): Optional PartialAnalysis results already computed for
+            some of the answers (see `analyze_partial`), keyed like `answers_dict`.
         
     Returns:
         A dictionary containing the combined analysis results.
     """
+    partials = partials or {}
+    answer_partials = {
+        question: partials[question] if question in partials else analyze_partial(answer, tokenizer)
+        for question, answer in answers_dict.items()
+    }
+
     full_analysis = {}
-    combined_text = " ".join(answers_dict.values())
+    # The combined analysis is merged from the per-answer ones instead of re-analyzing the joined text.
+    combined = merge_partials(answer_partials.values()).to_analysis()
     
-    full_analysis['all_tags'] = get_behavioral_tags(combined_text)
-    full_analysis['all_keywords'] = extract_keywords(combined_text)
+    full_analysis['all_tags'] = combined["tags"]
+    full_analysis['all_keywords'] = combined["keywords"]
     
     full_analysis['individual_analysis'] = {}
-    for question, answer in answers_dict.items():
-        analysis = {
-            "sentiment": analyze_sentiment(answer),
-            "keywords": extract_keywords(answer),
-            "tags": get_behavioral_tags(answer),
-        }
-        full_analysis['individual_analysis'][question] = analysis
+    for question, partial in answer_partials.items():
+        full_analysis['individual_analysis'][question] = partial.to_analysis()
         
-    return full_analysis
\ No newline at end of file
+    return full_analysis
+
+# --- Streaming Analysis ---
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# A "word" longer than this is cut instead of buffered, to keep memory bounded.
+MAX_TOKEN_CHARS = 1024
+
+def iter_text_chunks(source, chunk_size=STREAM_CHUNK_SIZE):
+    """Yields text chunks from a string, a text file object or an iterable of strings."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+def iter_stream_keywords(lowered_chunks, tokenizer=None):
+    """
+    Yields the keywords of a stream of lowercased text chunks.
+
+    Each chunk is tokenized up to its last whitespace; the unfinished word at
+    the end is carried into the next chunk, so words split across chunks are
+    counted once, exactly as `count_keywords` would count them.
+    """
+    tokenize = get_tokenizer(tokenizer)
+    stop_words = get_stop_words()
+    carry = ""
+    for chunk in lowered_chunks:
+        text = carry + PUNCTUATION_RE.sub("", chunk)
+        cut = len(text)
+        while cut and not text[cut - 1].isspace():
+            cut -= 1
+        if len(text) - cut > MAX_TOKEN_CHARS:
+            cut = len(text)
+        text, carry = text[:cut], text[cut:]
+        with timer("nlp.tokenize"):
+            tokens = tokenize(text)
+        for word in tokens:
+            if word.isalpha() and word not in stop_words:
+                yield word
+    if carry:
+        for word in tokenize(carry):
+            if word.isalpha() and word not in stop_words:
+                yield word
+
+@instrumented("nlp.analyze_stream")
+def analyze_stream(source, tokenizer=None, k=5, epsilon=0.0001, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Analyzes a text of any length in one pass with bounded memory.
+
+    Sentiment and tags come from the lexicon matcher, whose state is carried
+    across chunks so phrases split between chunks are still found. Keywords
+    are tracked with a Space-Saving sketch of ceil(1 / epsilon) entries; while
+    the text has fewer distinct keywords than that, the result is exactly
+    what `extract_keywords` returns.
+
+    Args:
+        source: A string, a text file object or an iterable of text chunks.
+        tokenizer (str): The tokenizer backend (see TOKENIZERS).
+        k (int): Number of keywords to return.
+        epsilon (float): Keyword counts are overestimated by at most
+            epsilon x the number of keywords in the text.
+        chunk_size (int): Characters read at a time from strings and files.
+
+    Returns:
+        A dictionary with the "sentiment", "keywords" and "tags" of the text,
+        the top keyword "keyword_counts", and the "keyword_error_bound" that
+        applies to those counts.
+    """
+    sketch = SpaceSaving.with_error(epsilon)
+    scan = {"state": 0, "found": set(LEXICON_MATCHER.feed("")[1])}
+
+    def lowered_chunks():
+        for chunk in iter_text_chunks(source, chunk_size):
+            chunk = chunk.lower()
+            with timer("nlp.match_lexicons"):
+                scan["state"], _ = LEXICON_MATCHER.feed(chunk, scan["state"], scan["found"])
+            yield chunk
+
+    sketch.update(iter_stream_keywords(lowered_chunks(), tokenizer))
+
+    matches = summarize_matches(scan["found"])
+    top = sketch.most_common(k)
+    return {
+        "sentiment": sentiment_from_counts(matches["positive"], matches["negative"]),
+        "keywords": [word for word, count in top],
+        "tags": matches["tags"],
+        "keyword_counts": top,
+        "keyword_error_bound": sketch.error_bound,
+    }
+
+def extract_keywords_stream(source, tokenizer=None, k=5, epsilon=0.0001, chunk_size=STREAM_CHUNK_SIZE):
+    """Streaming version of `extract_keywords` for long texts and files. See `analyze_stream`."""
+    return analyze_stream(source, tokenizer, k, epsilon, chunk_size)["keywords"]
+
+def _init_worker(tokenizer):
+    """Loads the stopwords and tokenizer models once when a worker starts."""
+    get_stop_words()
+    get_tokenizer(tokenizer)("warm up")
+
+def _analyze_chunk(chunk, tokenizer=None):
+    """Analyzes a list of (index, answers_dict) pairs inside a worker."""
+    return [(index, analyze_descriptive_answers(answers, tokenizer)) for index, answers in chunk]
+
+def analyze_many(answer_dicts, workers=None, chunksize=64, ordered=True, tokenizer=None):
+    """
+    Runs `analyze_descriptive_answers` over many respondents.
+
+    Work is sent to a process pool in chunks, and only a few chunks per worker
+    are in flight at once, so the input can be a lazy iterable of any size.
+
+    Args:
+        answer_dicts (iterable): Dictionaries of descriptive answers, one per respondent.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+            With 1 worker everything runs in the current process.
+        chunksize (int): Number of respondents sent to a worker at a time.
+        ordered (bool): If True, results are yielded in input order. If False,
+            (index, result) pairs are yielded as soon as each chunk completes.
+        tokenizer (str): The tokenizer backend for keyword extraction (see TOKENIZERS).
+
+    Yields:
+        The analysis result for each respondent, or (index, result) pairs when
+        `ordered` is False.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    get_tokenizer(tokenizer)  # Fail fast on an unknown backend name.
+
+    indexed = enumerate(answer_dicts)
+    chunks = iter(lambda: list(islice(indexed, chunksize)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            for index, result in _analyze_chunk(chunk, tokenizer):
+                yield result if ordered else (index, result)
+        return
+
+    # Imported here because loading multiprocessing slows down cold starts.
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tokenizer,)) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_analyze_chunk, chunk, tokenizer))
+                if len(pending) >= max_in_flight:
+                    for _, result in pending.popleft().result():
+                        yield result
+            while pending:
+                for _, result in pending.popleft().result():
+                    yield result
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_analyze_chunk, chunk, tokenizer))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
+
+if os.environ.get("NLP_CACHE_SIZE") or os.environ.get("NLP_CACHE_DB"):
+    enable_cache(int(os.environ.get("NLP_CACHE_SIZE") or 10000), os.environ.get("NLP_CACHE_DB"))
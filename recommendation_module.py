@@ -1,3 +1,10 @@
+import hashlib
+import json
+import os
+import threading
+from instrumentation import instrumented
+from mcq_module import PROFILES
+
 RECOMMENDATIONS = {
     "Basic": [
         {
@@ -41,30 +48,169 @@ RECOMMENDATIONS = {
     ]
 }
 
+# Output label for each catalog section.
+SECTION_LABELS = {"Basic": "Basic (Free)", "Premium": "Premium (Advanced)"}
+
+# Fully precompute the lookup table only while it stays this small.
+MAX_PRECOMPUTED_ENTRIES = 4096
+
+class CompiledCatalog:
+    """
+    A recommendation catalog compiled into bitmasks.
+
+    Every recommendation gets an ID (its position in the catalog, section by
+    section). The inverted indexes map each profile and each tag to a bitset of
+    recommendation IDs, so matching a (profile, tags) pair is a few bitwise
+    operations. Results are kept in a lookup table keyed by (profile, tag mask),
+    which is filled up front for small catalogs and on first use otherwise.
+    """
+
+    def __init__(self, catalog):
+        self.version = hashlib.sha1(json.dumps(catalog, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.section_labels = list(SECTION_LABELS.values())
+        self.entries = []  # (section label, formatted text) by recommendation ID
+        self.tags = []
+        self.tag_bits = {}
+        self.profile_index = {}
+        self.tag_index = {}
+        self.any_profile = 0  # Recommendations without a "for_profile" filter
+        self.untagged = 0  # Recommendations without a "for_tags" filter
+
+        for section, recs in catalog.items():
+            label = SECTION_LABELS.get(section, section)
+            if label not in self.section_labels:
+                self.section_labels.append(label)
+            for rec in recs:
+                rec_bit = 1 << len(self.entries)
+                self.entries.append((label, f"{rec['title']}: {rec['description']}"))
+
+                if "for_profile" in rec:
+                    for profile in rec["for_profile"]:
+                        self.profile_index[profile] = self.profile_index.get(profile, 0) | rec_bit
+                else:
+                    self.any_profile |= rec_bit
+
+                if "for_tags" in rec:
+                    for tag in rec["for_tags"]:
+                        if tag not in self.tag_bits:
+                            self.tag_bits[tag] = 1 << len(self.tags)
+                            self.tags.append(tag)
+                        self.tag_index[tag] = self.tag_index.get(tag, 0) | rec_bit
+                else:
+                    self.untagged |= rec_bit
+
+        # Recommendations matched by each single tag bit, for building a tag mask's bitset.
+        self._tag_recs = [self.tag_index[tag] for tag in self.tags]
+        self._table = {}
+
+        self.profiles = list(dict.fromkeys(PROFILES + list(self.profile_index)))
+        if len(self.profiles) << len(self.tags) <= MAX_PRECOMPUTED_ENTRIES:
+            for profile in self.profiles:
+                for tag_mask in range(1 << len(self.tags)):
+                    self._table[(profile, tag_mask)] = self.render(self.match(profile, tag_mask))
+
+    def tag_mask(self, tags):
+        """Converts tags to a bitmask. Tags no recommendation asks for are ignored."""
+        mask = 0
+        for tag in tags:
+            mask |= self.tag_bits.get(tag, 0)
+        return mask
+
+    def match(self, profile, tag_mask):
+        """Returns the bitset of recommendation IDs for a profile and tag mask."""
+        tagged = self.untagged
+        i = 0
+        while tag_mask:
+            if tag_mask & 1:
+                tagged |= self._tag_recs[i]
+            tag_mask >>= 1
+            i += 1
+        return (self.any_profile | self.profile_index.get(profile, 0)) & tagged
+
+    def render(self, rec_bits):
+        """Groups the recommendations in a bitset of IDs by section, in catalog order."""
+        grouped = {label: [] for label in self.section_labels}
+        rec_id = 0
+        while rec_bits:
+            if rec_bits & 1:
+                label, text = self.entries[rec_id]
+                grouped[label].append(text)
+            rec_bits >>= 1
+            rec_id += 1
+        return {label: tuple(texts) for label, texts in grouped.items()}
+
+    def lookup_ids(self, profile, tags):
+        """Returns the matching recommendations as a bitset of IDs."""
+        return self.match(profile, self.tag_mask(tags))
+
+    def lookup(self, profile, tags):
+        """Returns the recommendations for a profile and tags, grouped by section."""
+        key = (profile, self.tag_mask(tags))
+        result = self._table.get(key)
+        if result is None:
+            result = self.render(self.match(*key))
+            if profile in self.profiles:  # Don't let unknown profile strings grow the table.
+                self._table[key] = result
+        return result
+
+_compiled = CompiledCatalog(RECOMMENDATIONS)
+_catalog_lock = threading.Lock()
+_watched_file = None
+_watched_mtime = None
+
+def set_catalog(catalog):
+    """Compiles a new catalog and swaps it in for all following calls."""
+    global RECOMMENDATIONS, _compiled
+    compiled = CompiledCatalog(catalog)
+    RECOMMENDATIONS, _compiled = catalog, compiled
+    return compiled
+
+def load_catalog(path):
+    """Loads a catalog from a JSON file with the same shape as RECOMMENDATIONS."""
+    with open(path, encoding="utf-8") as f:
+        return set_catalog(json.load(f))
+
+def watch_catalog_file(path):
+    """
+    Loads the catalog from `path` and reloads it whenever the file changes,
+    so the catalog can be updated without a restart.
+    """
+    global _watched_file, _watched_mtime
+    with _catalog_lock:
+        _watched_mtime = os.stat(path).st_mtime_ns
+        load_catalog(path)
+        _watched_file = path
+
+def _reload_if_changed():
+    """Reloads the watched catalog file if it was modified since the last load."""
+    global _watched_mtime
+    try:
+        mtime = os.stat(_watched_file).st_mtime_ns
+    except OSError:
+        return  # Keep serving the last good catalog while the file is being replaced.
+    if mtime == _watched_mtime:
+        return
+    with _catalog_lock:
+        if mtime != _watched_mtime:
+            # Remembered even if loading fails, so a broken file is parsed once
+            # rather than on every call; the next write changes the mtime again.
+            _watched_mtime = mtime
+            try:
+                load_catalog(_watched_file)
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # Keep the last good catalog if the new file is incomplete or invalid.
+
+def get_catalog():
+    """Returns the compiled catalog currently in use."""
+    if _watched_file is not None:
+        _reload_if_changed()
+    return _compiled
+
+@instrumented("recommendations.get_recommendations")
 def get_recommendations(profile, tags):
     """Filters and returns recommendations based on user profile and behavioral tags."""
-    
-    personalized_recs = {"Basic (Free)": [], "Premium (Advanced)": []}
-    
-    # Flatten the tags for easier checking
-    all_tags = set(tags)
-    
-    # Check Basic recommendations
-    for rec in RECOMMENDATIONS["Basic"]:
-        # Check if recommendation is for the user's profile
-        profile_match = "for_profile" not in rec or profile in rec.get("for_profile", [])
-        # Check if recommendation matches any of the user's tags
-        tag_match = "for_tags" not in rec or any(tag in all_tags for tag in rec.get("for_tags", []))
-        
-        if profile_match and tag_match:
-            personalized_recs["Basic (Free)"].append(f"{rec['title']}: {rec['description']}")
-
-    # Check Premium recommendations
-    for rec in RECOMMENDATIONS["Premium"]:
-        profile_match = "for_profile" not in rec or profile in rec.get("for_profile", [])
-        tag_match = "for_tags" not in rec or any(tag in all_tags for tag in rec.get("for_tags", []))
-        
-        if profile_match and tag_match:
-            personalized_recs["Premium (Advanced)"].append(f"{rec['title']}: {rec['description']}")
-            
-    return personalized_recs
\ No newline at end of file
+    result = get_catalog().lookup(profile, tags)
+    return {label: list(texts) for label, texts in result.items()}
+
+if os.environ.get("RECOMMENDATIONS_FILE"):
+    watch_catalog_file(os.environ["RECOMMENDATIONS_FILE"])
@@ -0,0 +1,120 @@
+"""
+Renders the final report as text, markdown or JSON for every front-end.
+
+The report only depends on the profile, the behavioral tags and the
+recommendation catalog, so its fragments (summary, recommendations and the
+rendered text and markdown blocks) are built once per (profile, tag
+bitmask, catalog version) and shared by every respondent with the same
+combination. `main.py` prints `render_text`, `app.py` shows
+`render_markdown` and the batch mode writes `render_json`.
+"""
+import json
+import threading
+
+from instrumentation import instrumented
+from recommendation_module import get_catalog
+from result_types import mask_to_tags, tags_to_mask
+
+# Well above the number of (profile, tag set) combinations; the cache is
+# only cleared if a catalog reload leaves stale versions behind.
+MAX_CACHED_FRAGMENTS = 4096
+
+_fragments = {}
+_lock = threading.Lock()
+
+@instrumented("report.generate_summary")
+def generate_summary(profile, tags):
+    """Generates a 2-3 line personalized summary."""
+    summary = f"Your results show you're in the '{profile}' category. "
+
+    if not tags:
+        summary += "You seem to have a good handle on your productivity habits."
+        return summary
+
+    if "procrastination" in tags and "distraction" in tags:
+        summary += "It seems like procrastination and frequent distractions are key challenges for you. "
+    elif "burnout" in tags or "time anxiety" in tags:
+        summary += "We've noticed signs of potential burnout and pressure related to time management. "
+    else:
+        summary += f"You appear to be struggling with {tags[0]}. "
+
+    summary += "Let's find some steps to help you improve."
+    return summary
+
+class ReportFragments:
+    """The rendered parts of the report for one (profile, tag set, catalog)."""
+    __slots__ = ("profile", "tags", "summary", "recommendations", "text", "markdown")
+
+    def __init__(self, profile, tags, catalog):
+        self.profile = profile
+        self.tags = tuple(tags)
+        self.summary = generate_summary(profile, list(tags))
+        self.recommendations = catalog.lookup(profile, list(tags))
+        self.text = self._render_text()
+        self.markdown = self._render_markdown()
+
+    def _render_text(self):
+        lines = [
+            "\n\n======================================",
+            "      Your Personalized Analysis      ",
+            "======================================\n",
+            f"👤 PRODUCTIVITY PROFILE: {self.profile}\n",
+            "📝 SUMMARY:",
+            f"   {self.summary}\n",
+            "💡 RECOMMENDED ACTIONS:\n",
+        ]
+        for i, (label, recs) in enumerate(self.recommendations.items()):
+            if recs:
+                header = f"--- {label} ---"
+                lines.append(header if i == 0 else "\n" + header)
+                lines.extend(f"  • {rec}" for rec in recs)
+        return "\n".join(lines)
+
+    def _render_markdown(self):
+        parts = [f"### 👤 Your Productivity Profile: {self.profile}", f"*{self.summary}*"]
+        for label, recs in self.recommendations.items():
+            if recs:
+                parts.append(f"#### {label} Recommendations\n" + "\n".join(f"- {rec}" for rec in recs))
+        return "\n\n".join(parts)
+
+@instrumented("report.get_fragments")
+def get_fragments(profile, tags, catalog=None):
+    """Returns the memoized ReportFragments for a profile and tag list."""
+    catalog = catalog or get_catalog()
+    tag_mask = tags_to_mask(tags)
+    key = (profile, tag_mask, catalog.version)
+    fragments = _fragments.get(key)
+    if fragments is None:
+        # Render tags in canonical order so equal tag sets share one entry.
+        fragments = ReportFragments(profile, mask_to_tags(tag_mask), catalog)
+        with _lock:
+            if len(_fragments) >= MAX_CACHED_FRAGMENTS:
+                _fragments.clear()
+            _fragments[key] = fragments
+    return fragments
+
+def clear_cache():
+    """Discards all memoized fragments."""
+    with _lock:
+        _fragments.clear()
+
+def _profile_and_tags(result):
+    """Reads the profile and tags of an AssessmentResult or a process_submission dictionary."""
+    if isinstance(result, dict):
+        system_output = result["system_output"]
+        return system_output["profile"], system_output["nlp_analysis"]["all_tags"]
+    return result.profile, result.tags
+
+def render_text(result):
+    """Renders the report as plain text for the terminal."""
+    return get_fragments(*_profile_and_tags(result)).text
+
+def render_markdown(result):
+    """Renders the report as markdown."""
+    return get_fragments(*_profile_and_tags(result)).markdown
+
+def render_json(result, indent=None, ensure_ascii=False):
+    """Renders the full result (see main.process_submission) as JSON."""
+    output_data = result if isinstance(result, dict) else result.to_dict()
+    separators = None if indent else (",", ":")
+    return json.dumps(output_data, indent=indent, separators=separators, ensure_ascii=ensure_ascii)
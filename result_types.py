@@ -0,0 +1,167 @@
+"""
+Compact result objects for holding many assessments in memory.
+
+`AssessmentResult` stores one respondent's output in slotted objects with
+small codes instead of nested dicts: MCQ choices as a `bytes` row, the
+profile as an index into PROFILES, tags as an int bitmask, sentiment as a
+small enum and recommendations as a bitset of catalog IDs. Keyword strings
+are interned so identical keywords are stored once per process.
+
+Nothing is formatted until it is asked for: `to_dict()` builds the same
+JSON shape as `main.process_submission` on demand.
+"""
+import sys
+from enum import IntEnum
+
+from mcq_module import PROFILES, QUESTIONS, get_productivity_profile, score_choice, score_mcq_choices
+from nlp_module import BEHAVIORAL_TAG_MAP, analyze_partial, merge_partials
+
+TAG_NAMES = list(BEHAVIORAL_TAG_MAP)
+TAG_BITS = {tag: 1 << i for i, tag in enumerate(TAG_NAMES)}
+
+class Sentiment(IntEnum):
+    NEGATIVE = 0
+    NEUTRAL = 1
+    POSITIVE = 2
+
+    @property
+    def label(self):
+        return self.name.capitalize()
+
+    @classmethod
+    def from_label(cls, label):
+        return cls[label.upper()]
+
+def tags_to_mask(tags):
+    """Converts a list of tag names to a bitmask over TAG_NAMES."""
+    mask = 0
+    for tag in tags:
+        mask |= TAG_BITS[tag]
+    return mask
+
+def mask_to_tags(mask):
+    """Converts a tag bitmask back to tag names, in BEHAVIORAL_TAG_MAP order."""
+    return [tag for i, tag in enumerate(TAG_NAMES) if mask >> i & 1]
+
+class AnswerResult:
+    """The analysis of one descriptive answer."""
+    __slots__ = ("question", "answer", "sentiment", "keywords", "tag_mask")
+
+    def __init__(self, question, answer, sentiment, keywords, tag_mask):
+        self.question = question
+        self.answer = answer
+        self.sentiment = sentiment
+        self.keywords = keywords
+        self.tag_mask = tag_mask
+
+    @classmethod
+    def from_analysis(cls, question, answer, analysis):
+        return cls(
+            sys.intern(question),
+            answer,
+            Sentiment.from_label(analysis["sentiment"]),
+            tuple(sys.intern(word) for word in analysis["keywords"]),
+            tags_to_mask(analysis["tags"]),
+        )
+
+    def to_dict(self):
+        return {
+            "sentiment": self.sentiment.label,
+            "keywords": list(self.keywords),
+            "tags": mask_to_tags(self.tag_mask),
+        }
+
+class AssessmentResult:
+    """One respondent's complete assessment output."""
+    __slots__ = ("id", "has_id", "choices", "answers", "all_keywords", "tag_mask", "profile_code", "rec_bits", "catalog")
+
+    def __init__(self, id, choices, answers, all_keywords, tag_mask, profile_code, rec_bits, catalog, has_id=None):
+        self.id = id
+        # Whether the submission had an "id" key, which may itself be null.
+        self.has_id = id is not None if has_id is None else has_id
+        self.choices = choices
+        self.answers = answers
+        self.all_keywords = all_keywords
+        self.tag_mask = tag_mask
+        self.profile_code = profile_code
+        self.rec_bits = rec_bits
+        self.catalog = catalog
+
+    @classmethod
+    def from_submission(cls, submission, tokenizer=None):
+        """Runs the pipeline on a submission (see main.process_submission) into a compact result."""
+        from recommendation_module import get_catalog
+
+        choices = submission["mcq_choices"]
+        mcq_score, _ = score_mcq_choices(choices)
+        profile = get_productivity_profile(mcq_score)
+
+        partials = {question: analyze_partial(answer, tokenizer) for question, answer in submission["descriptive_answers"].items()}
+        answers = tuple(
+            AnswerResult.from_analysis(question, submission["descriptive_answers"][question], partial.to_analysis())
+            for question, partial in partials.items()
+        )
+        combined = merge_partials(partials.values()).to_analysis()
+
+        catalog = get_catalog()
+        return cls(
+            submission.get("id"),
+            bytes(choices),
+            answers,
+            tuple(sys.intern(word) for word in combined["keywords"]),
+            tags_to_mask(combined["tags"]),
+            PROFILES.index(profile),
+            catalog.lookup_ids(profile, combined["tags"]),
+            catalog,
+            has_id="id" in submission,
+        )
+
+    @property
+    def profile(self):
+        return PROFILES[self.profile_code]
+
+    @property
+    def tags(self):
+        return mask_to_tags(self.tag_mask)
+
+    @property
+    def scores(self):
+        """The per-question MCQ scores, 0 for best and 3 for worst."""
+        return [score_choice(q, choice) for q, choice in zip(QUESTIONS, self.choices)]
+
+    @property
+    def mcq_score(self):
+        return sum(self.scores)
+
+    def recommendations(self):
+        """Returns the recommendations grouped by section, as get_recommendations does."""
+        return {label: list(texts) for label, texts in self.catalog.render(self.rec_bits).items()}
+
+    def to_dict(self):
+        """Builds the output in the same shape as `main.process_submission`."""
+        from report_module import get_fragments
+
+        tags = self.tags
+        output_data = {
+            "user_input": {
+                "mcq_answers": {
+                    f"Q{i+1}": {"answer": q["options"][choice - 1], "score": score_choice(q, choice)}
+                    for i, (q, choice) in enumerate(zip(QUESTIONS, self.choices))
+                },
+                "descriptive_answers": {answer.question: answer.answer for answer in self.answers},
+            },
+            "system_output": {
+                "mcq_score": self.mcq_score,
+                "profile": self.profile,
+                "nlp_analysis": {
+                    "all_tags": tags,
+                    "all_keywords": list(self.all_keywords),
+                    "individual_analysis": {answer.question: answer.to_dict() for answer in self.answers},
+                },
+                "summary": get_fragments(self.profile, tags).summary,
+                "recommendations": self.recommendations(),
+            },
+        }
+        if self.has_id:
+            output_data = {"id": self.id, **output_data}
+        return output_data
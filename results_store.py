@@ -0,0 +1,279 @@
+"""
+Append-only columnar store of assessment results.
+
+A store is a directory of immutable segments. Each segment holds a batch of
+results as one NumPy column file per field:
+
+    scores.npy      n x 10 uint8   per-question MCQ scores
+    profile.npy     n      uint8   index into mcq_module.PROFILES
+    tags.npy        n      uint32  bitmask over result_types.TAG_NAMES
+    sentiment.npy   n x A  uint8   Sentiment code per answer key (255 if missing)
+    recs.npy        n x W  uint64  recommendation ID bitset, in 64-bit words
+    meta.json              schema, row count and the catalog the IDs refer to
+
+Each segment records its own answer keys (the sentiment columns): the keys
+of the results in it, in the order they first appear. Descriptive answers
+are optional, so a result without one of the keys stores 255 for it, and
+the store's keys grow as new ones are appended.
+
+Segments are written to a temporary directory and renamed into place, so
+readers never see a partial segment, and are memory-mapped when read.
+Aggregation queries work column by column over the mapped arrays and never
+rebuild whole records:
+
+    store = ResultsStore("results")
+    with store.writer() as writer:
+        for submission in submissions:
+            writer.append(AssessmentResult.from_submission(submission))
+    store.profile_distribution()
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from mcq_module import PROFILES, QUESTIONS
+from result_types import TAG_NAMES, Sentiment
+
+FORMAT_VERSION = 1
+SEGMENT_ROWS = 65536
+MISSING_SENTIMENT = 255
+
+class Segment:
+    """One immutable, memory-mapped segment of a store."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment format {self.meta['format_version']} in {path}")
+        self.rows = self.meta["rows"]
+        self._columns = {}
+
+    def column(self, name):
+        """Returns a column as a read-only memory-mapped array."""
+        array = self._columns.get(name)
+        if array is None:
+            array = self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return array
+
+    def tag_bits(self):
+        """Returns the tag masks as an n x tags boolean matrix."""
+        return (self.column("tags")[:, None] >> np.arange(len(self.meta["tags"]), dtype=np.uint32)) & 1 == 1
+
+class SegmentWriter:
+    """
+    Buffers results and writes them out as segments of up to `segment_rows`.
+
+    Use it as a context manager (or call `close()`) so the last partial
+    segment is written.
+    """
+
+    def __init__(self, store, segment_rows=SEGMENT_ROWS):
+        self.store = store
+        self.segment_rows = segment_rows
+        self._catalog = None
+        self._rows = []
+
+    def append(self, result):
+        """Adds a result_types.AssessmentResult."""
+        if self._catalog is not None and result.catalog.version != self._catalog.version:
+            # Recommendation IDs are only meaningful within one catalog version.
+            self.flush()
+        self._catalog = result.catalog
+        self._rows.append((
+            result.scores,
+            result.profile_code,
+            result.tag_mask,
+            {answer.question: answer.sentiment for answer in result.answers},
+            result.rec_bits,
+        ))
+        if len(self._rows) >= self.segment_rows:
+            self.flush()
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def flush(self):
+        """Writes the buffered results as a new segment."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        scores, profiles, tags, sentiments, rec_bits = zip(*rows)
+
+        words = max(1, (len(self._catalog.entries) + 63) // 64)
+        recs = np.zeros((len(rows), words), dtype=np.uint64)
+        for i, bits in enumerate(rec_bits):
+            for w in range(words):
+                recs[i, w] = (bits >> (64 * w)) & 0xFFFFFFFFFFFFFFFF
+
+        answer_keys = list(dict.fromkeys(key for row in sentiments for key in row))
+        sentiment = np.full((len(rows), len(answer_keys)), MISSING_SENTIMENT, dtype=np.uint8)
+        for j, key in enumerate(answer_keys):
+            for i, row in enumerate(sentiments):
+                if key in row:
+                    sentiment[i, j] = row[key]
+
+        columns = {
+            "scores": np.array(scores, dtype=np.uint8).reshape(len(rows), len(QUESTIONS)),
+            "profile": np.array(profiles, dtype=np.uint8),
+            "tags": np.array(tags, dtype=np.uint32),
+            "sentiment": sentiment,
+            "recs": recs,
+        }
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "rows": len(rows),
+            "profiles": PROFILES,
+            "tags": TAG_NAMES,
+            "answer_keys": answer_keys,
+            "catalog_version": self._catalog.version,
+            "recommendations": [list(entry) for entry in self._catalog.entries],
+        }
+        self.store._write_segment(columns, meta)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+class ResultsStore:
+    """A directory of columnar result segments with cohort aggregation queries."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._segments = {}
+
+    def writer(self, segment_rows=SEGMENT_ROWS):
+        """Returns a SegmentWriter that appends to this store."""
+        return SegmentWriter(self, segment_rows)
+
+    def _segment_names(self):
+        return sorted(name for name in os.listdir(self.path) if name.startswith("seg-"))
+
+    def _write_segment(self, columns, meta):
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.path)
+        for name, array in columns.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        names = self._segment_names()
+        number = int(names[-1][4:]) + 1 if names else 1
+        while True:
+            try:
+                # Renaming onto an existing non-empty directory fails, so
+                # concurrent writers cannot claim the same segment number.
+                os.rename(tmp, os.path.join(self.path, f"seg-{number:08d}"))
+                return
+            except OSError:
+                if not os.path.isdir(os.path.join(self.path, f"seg-{number:08d}")):
+                    raise
+                number += 1
+
+    def segments(self):
+        """Returns the store's segments in the order they were written."""
+        result = []
+        for name in self._segment_names():
+            segment = self._segments.get(name)
+            if segment is None:
+                segment = self._segments[name] = Segment(os.path.join(self.path, name))
+            result.append(segment)
+        return result
+
+    def __len__(self):
+        return sum(segment.rows for segment in self.segments())
+
+    @property
+    def answer_keys(self):
+        """The answer keys of all segments, in the order they first appear."""
+        return list(dict.fromkeys(key for segment in self.segments() for key in segment.meta["answer_keys"]))
+
+    def profile_distribution(self):
+        """Returns {profile: number of results}."""
+        counts = np.zeros(len(PROFILES), dtype=np.int64)
+        for segment in self.segments():
+            counts += np.bincount(segment.column("profile"), minlength=len(PROFILES))[:len(PROFILES)]
+        return dict(zip(PROFILES, counts.tolist()))
+
+    def tag_frequency(self):
+        """Returns {tag: number of results with that tag}."""
+        counts = np.zeros(len(TAG_NAMES), dtype=np.int64)
+        for segment in self.segments():
+            counts += segment.tag_bits().sum(axis=0)
+        return dict(zip(TAG_NAMES, counts.tolist()))
+
+    def tag_cooccurrence(self):
+        """
+        Returns {tag: {other tag: number of results with both}}. The diagonal
+        holds the plain tag frequencies.
+        """
+        matrix = np.zeros((len(TAG_NAMES), len(TAG_NAMES)), dtype=np.int64)
+        for segment in self.segments():
+            bits = segment.tag_bits().astype(np.int64)
+            matrix += bits.T @ bits
+        return {tag: dict(zip(TAG_NAMES, row.tolist())) for tag, row in zip(TAG_NAMES, matrix)}
+
+    def sentiment_by_profile(self):
+        """Returns {profile: {sentiment label: number of answers}}."""
+        labels = [sentiment.label for sentiment in Sentiment]
+        counts = np.zeros((len(PROFILES), len(labels)), dtype=np.int64)
+        for segment in self.segments():
+            sentiment = segment.column("sentiment")
+            profile = np.repeat(segment.column("profile"), sentiment.shape[1])
+            sentiment = sentiment.ravel()
+            present = sentiment != MISSING_SENTIMENT
+            cells = profile[present].astype(np.int64) * len(labels) + sentiment[present]
+            counts += np.bincount(cells, minlength=counts.size).reshape(counts.shape)
+        return {profile: dict(zip(labels, row.tolist())) for profile, row in zip(PROFILES, counts)}
+
+    def question_averages(self):
+        """Returns the mean score of each MCQ question (0 best, 3 worst), as a list."""
+        totals = np.zeros(len(QUESTIONS), dtype=np.int64)
+        rows = 0
+        for segment in self.segments():
+            totals += segment.column("scores").sum(axis=0, dtype=np.int64)
+            rows += segment.rows
+        return (totals / rows).tolist() if rows else [0.0] * len(QUESTIONS)
+
+    def recommendation_counts(self):
+        """Returns {recommendation text: number of results it was recommended to}."""
+        counts = {}
+        for segment in self.segments():
+            recs = segment.column("recs")
+            for rec_id, (_, text) in enumerate(segment.meta["recommendations"]):
+                word, bit = divmod(rec_id, 64)
+                hits = int(np.count_nonzero(recs[:, word] & np.uint64(1 << bit)))
+                counts[text] = counts.get(text, 0) + hits
+        return counts
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print cohort aggregations of a results store.")
+    parser.add_argument("path", help="The store directory.")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.path)
+    report = {
+        "results": len(store),
+        "profile_distribution": store.profile_distribution(),
+        "tag_frequency": store.tag_frequency(),
+        "tag_cooccurrence": store.tag_cooccurrence(),
+        "sentiment_by_profile": store.sentiment_by_profile(),
+        "question_averages": store.question_averages(),
+        "recommendation_counts": store.recommendation_counts(),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+A local asyncio HTTP service for scoring assessments.
+
+Concurrent submissions are collected into micro-batches, and each batch runs
+the full pipeline (profile, NLP analysis, summary, recommendations) in a
+process pool, so the event loop never blocks on CPU-bound work.
+
+    python service.py --port 8080 --workers 4
+
+Endpoints:
+    POST /assess   A submission in the batch-mode format (see main.process_submission).
+    GET  /health   Liveness and queue depth.
+    GET  /latency  Request latency percentiles and batch sizes.
+    GET  /metrics  Per-stage timings of this process in Prometheus text format
+                   (with COACH_METRICS=1; pipeline stages run in the workers).
+
+Example:
+    curl -s localhost:8080/assess -d '{"mcq_choices": [1,2,3,4,1,2,3,4,1,2], "descriptive_answers": {"challenge": "I put off work"}}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentation
+from main import process_submission
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+def process_batch(submissions):
+    """
+    Scores a batch of submissions inside a worker.
+
+    Returns:
+        A list of (ok, result) pairs, where result is the output dictionary or
+        an error message for submissions that could not be processed.
+    """
+    results = []
+    for submission in submissions:
+        try:
+            results.append((True, process_submission(submission)))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+    return results
+
+class MicroBatcher:
+    """
+    Groups concurrent requests into batches for an executor.
+
+    A batch is sent as soon as it has `max_batch_size` items or the oldest item
+    has waited `max_wait_ms`. At most `max_in_flight` batches run at once, which
+    keeps every executor worker busy without queuing unbounded work on it.
+    """
+
+    def __init__(self, process_batch, executor, max_batch_size=32, max_wait_ms=5, max_in_flight=1):
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._task = None
+        # The event loop only keeps weak references to tasks, so running batches are held here.
+        self._running = set()
+        self.batch_sizes = deque(maxlen=1000)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    async def submit(self, item):
+        """
+        Queues one item and waits for its (ok, result) pair. Raises the
+        executor's exception if its batch could not be run at all.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        """Forms batches from the queue under the size and wait limits."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        """Runs one batch in the executor and resolves its futures."""
+        loop = asyncio.get_running_loop()
+        try:
+            self.batch_sizes.append(len(batch))
+            with instrumentation.timer("service.batch"):
+                results = await loop.run_in_executor(self.executor, self.process_batch, [item for item, _ in batch])
+        except Exception as e:
+            # A broken pool or a bug is a server failure, not a bad submission.
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+class LatencyTracker:
+    """Keeps the latencies of recent requests for the /latency endpoint."""
+
+    def __init__(self, size=10000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        def pct(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+        return {"requests": self.count, "window": len(ordered), "p50_ms": pct(50), "p90_ms": pct(90), "p99_ms": pct(99), "max_ms": pct(100)}
+
+class AssessmentService:
+    """The HTTP front end: parses requests and routes them to the batcher."""
+
+    def __init__(self, executor, max_batch_size=32, max_wait_ms=5, max_in_flight=1):
+        self.batcher = MicroBatcher(process_batch, executor, max_batch_size, max_wait_ms, max_in_flight)
+        self.latency = LatencyTracker()
+        self.started = time.time()
+
+    async def handle_connection(self, reader, writer):
+        """Serves requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, {"error": "Headers too large."}, keep_alive=False)
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length."}, keep_alive=False)
+                    break
+                if length < 0 or length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        """Returns the (status, payload) for a request."""
+        if path == "/assess":
+            if method != "POST":
+                return 405, {"error": "Use POST."}
+            return await self.assess(body)
+        if path == "/health":
+            return 200, {"status": "ok", "uptime_s": round(time.time() - self.started, 1), "queue_depth": self.batcher.queue_depth}
+        if path == "/latency":
+            sizes = self.batcher.batch_sizes
+            return 200, {**self.latency.summary(), "batches": len(sizes), "mean_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else None}
+        if path == "/metrics":
+            return 200, instrumentation.render_prometheus()
+        return 404, {"error": f"No route for {path}."}
+
+    async def assess(self, body):
+        """Scores one submission through the micro-batcher."""
+        start = time.perf_counter()
+        try:
+            submission = json.loads(body)
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if not isinstance(submission, dict):
+            return 400, {"error": "Expected a JSON object."}
+
+        try:
+            ok, result = await self.batcher.submit(submission)
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - start
+        self.latency.record(elapsed)
+        if instrumentation.ENABLED:
+            instrumentation.record("service.assess", elapsed)
+        return (200, result) if ok else (400, {"error": result})
+
+    async def _respond(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+async def start_service(host="127.0.0.1", port=8080, executor=None, max_batch_size=32, max_wait_ms=5, max_in_flight=None):
+    """
+    Starts the service on the running event loop.
+
+    Returns:
+        A tuple of (asyncio server, AssessmentService). Call `service.batcher.stop()`
+        and `server.close()` to shut it down.
+    """
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    if max_in_flight is None:
+        max_in_flight = os.cpu_count() or 1
+    service = AssessmentService(executor, max_batch_size, max_wait_ms, max_in_flight)
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    return server, service
+
+async def serve(host, port, workers, max_batch_size, max_wait_ms):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        server, service = await start_service(host, port, executor, max_batch_size, max_wait_ms, workers)
+        print(f"Serving on http://{host}:{port} with {workers} workers (batch <= {max_batch_size}, wait <= {max_wait_ms} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.batcher.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the assessment scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for the pipeline.")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
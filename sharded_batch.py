@@ -0,0 +1,286 @@
+"""
+Offset-indexed, sharded and resumable batch scoring of JSONL submissions.
+
+The first run scans the input once through mmap and writes a sidecar index
+(`<input>.idx`) with the byte offset of every line, so any record can be
+read by ordinal and the file can be split into contiguous line ranges
+without another pass. Each range (shard) is scored by a worker process
+with the regular batch-mode pipeline (see main.score_line) into its own
+output file, with a checkpoint every `checkpoint_every` records.
+
+If a run is interrupted, running the same command again resumes every
+shard from its last checkpoint: the shard output is truncated to the
+checkpointed byte offset and scoring continues from the next record.
+Finished shards are concatenated in order, so the output is identical to
+`python main.py --batch IN --out OUT`.
+
+    python sharded_batch.py submissions.jsonl --out results.jsonl --workers 4
+
+Index layout (all integers little-endian):
+    header:  magic b"JSONLIDX", format version (u32), input size (u64),
+             input mtime in ns (u64), line count (u64)
+    offsets: line count + 1 u64 values; line i spans offsets[i]:offsets[i+1]
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b"JSONLIDX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQQQ")
+SCAN_BLOCK = 64 * 1024 * 1024
+CHECKPOINT_EVERY = 1000
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def build_index(path, index_path=None):
+    """
+    Scans a JSONL file through mmap and writes its line offset index.
+
+    Returns:
+        The path of the index file.
+    """
+    index_path = index_path or path + ".idx"
+    size, mtime_ns = _file_stamp(path)
+    starts = [np.zeros(1, dtype=np.uint64)]
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for block_start in range(0, size, SCAN_BLOCK):
+                count = min(SCAN_BLOCK, size - block_start)
+                block = np.frombuffer(mm, dtype=np.uint8, count=count, offset=block_start)
+                starts.append((np.flatnonzero(block == ord("\n")) + block_start + 1).astype(np.uint64))
+                del block  # The mmap cannot be closed while a view of it is alive.
+    offsets = np.concatenate(starts)
+    if offsets[-1] != size:
+        offsets = np.append(offsets, np.uint64(size))  # The last line has no trailing newline.
+
+    with open(index_path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, size, mtime_ns, len(offsets) - 1))
+        f.write(offsets.astype("<u8").tobytes())
+    os.replace(index_path + ".tmp", index_path)
+    return index_path
+
+class JsonlIndex:
+    """Random access to the lines of a JSONL file through its offset index."""
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        with open(self.index_path, "rb") as f:
+            magic, version, size, mtime_ns, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.index_path} is not a version {FORMAT_VERSION} JSONL index")
+        if (size, mtime_ns) != _file_stamp(path):
+            raise ValueError(f"{self.index_path} is stale: {path} has changed since it was built")
+        self.size = size
+        self.offsets = np.memmap(self.index_path, dtype="<u8", mode="r", offset=HEADER.size, shape=(count + 1,))
+        self._file = None
+        self._mm = None
+
+    @classmethod
+    def open(cls, path, index_path=None):
+        """Opens the index of `path`, building or rebuilding it if needed."""
+        try:
+            return cls(path, index_path)
+        except (OSError, ValueError, struct.error):
+            return cls(path, build_index(path, index_path))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _map(self):
+        if self._mm is None:
+            self._file = open(self.path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        return self._mm
+
+    def line(self, i):
+        """Returns line `i` (0-based) as bytes, including its newline."""
+        return self._map()[int(self.offsets[i]):int(self.offsets[i + 1])]
+
+    def record(self, i):
+        """Returns the parsed JSON record on line `i` (0-based)."""
+        return json.loads(self.line(i))
+
+    def close(self):
+        if self._mm is not None and self.size:
+            self._mm.close()
+        if self._file is not None:
+            self._file.close()
+        self._mm = self._file = None
+
+def shard_ranges(count, shards):
+    """Splits `count` lines into at most `shards` contiguous (start, end) ranges."""
+    shards = max(1, min(shards, count))
+    bounds = [count * i // shards for i in range(shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(shards)]
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _shard_paths(work_dir, shard):
+    base = os.path.join(work_dir, f"shard-{shard:05d}")
+    return base + ".jsonl", base + ".ckpt"
+
+def score_shard(in_path, index_path, work_dir, shard, start, end, checkpoint_every=CHECKPOINT_EVERY):
+    """
+    Scores lines [start, end) of the input into the shard's output file,
+    resuming from the shard's checkpoint if there is one.
+
+    Returns:
+        A tuple of (processed, failed) counts for the whole shard.
+    """
+    from main import render_json, score_line
+
+    out_path, checkpoint_path = _shard_paths(work_dir, shard)
+    checkpoint = _read_json(checkpoint_path)
+    out_size = os.path.getsize(out_path) if os.path.exists(out_path) else -1
+    if (
+        checkpoint is None
+        or (checkpoint["start"], checkpoint["end"]) != (start, end)
+        # The checkpointed output is gone or cut short, so its records must be redone.
+        or out_size < checkpoint["offset"]
+    ):
+        checkpoint = {"start": start, "end": end, "done": 0, "offset": 0, "processed": 0, "failed": 0}
+    if checkpoint["done"] == end - start and out_size >= 0:
+        return checkpoint["processed"], checkpoint["failed"]
+
+    index = JsonlIndex(in_path, index_path)
+    mode = "r+b" if out_size >= 0 else "wb"
+    try:
+        with open(out_path, mode) as out_file:
+            # Anything written after the last checkpoint is discarded and redone.
+            out_file.truncate(checkpoint["offset"])
+            out_file.seek(checkpoint["offset"])
+            for i in range(start + checkpoint["done"], end):
+                line = index.line(i)
+                if line.strip():
+                    try:
+                        text = line.decode("utf-8")
+                    except UnicodeDecodeError as e:
+                        result, ok = {"line": i + 1, "error": f"{type(e).__name__}: {e}"}, False
+                    else:
+                        result, ok = score_line(text, i + 1)
+                    checkpoint["processed" if ok else "failed"] += 1
+                    out_file.write(render_json(result).encode("utf-8") + b"\n")
+                checkpoint["done"] = i + 1 - start
+                if checkpoint["done"] % checkpoint_every == 0 or i + 1 == end:
+                    out_file.flush()
+                    os.fsync(out_file.fileno())
+                    checkpoint["offset"] = out_file.tell()
+                    _write_json(checkpoint_path, checkpoint)
+    finally:
+        index.close()
+    return checkpoint["processed"], checkpoint["failed"]
+
+def _is_work_file(name):
+    """True for the files run_sharded writes in its work directory."""
+    return name.startswith("shard-") or name.startswith("manifest.json")
+
+def _remove_work_files(work_dir):
+    """Deletes the shard files and manifest, and the directory if nothing else is left."""
+    for name in os.listdir(work_dir):
+        if _is_work_file(name):
+            os.remove(os.path.join(work_dir, name))
+    try:
+        os.rmdir(work_dir)
+    except OSError:
+        pass  # Not empty: it holds files this tool did not write.
+
+def _score_shard_args(args):
+    return score_shard(*args)
+
+def run_sharded(in_path, out_path, workers=None, work_dir=None, checkpoint_every=CHECKPOINT_EVERY, keep_shards=False):
+    """
+    Scores a JSONL file in contiguous shards across worker processes and
+    concatenates the shard outputs, in order, into `out_path`.
+
+    Rerunning with the same `work_dir` after an interruption resumes from
+    the checkpoints. The shard layout is fixed by the first run, so a rerun
+    may use a different number of workers.
+
+    Returns:
+        A tuple of (processed, failed) counts.
+    """
+    workers = workers or os.cpu_count() or 1
+    work_dir = work_dir or out_path + ".shards"
+    manifest_path = os.path.join(work_dir, "manifest.json")
+    if os.path.isdir(work_dir) and os.listdir(work_dir) and not os.path.exists(manifest_path):
+        raise ValueError(f"{work_dir} is not empty and is not a work directory of a previous run")
+    os.makedirs(work_dir, exist_ok=True)
+    index = JsonlIndex.open(in_path)
+    index_path, count = index.index_path, len(index)
+    index.close()
+
+    size, mtime_ns = _file_stamp(in_path)
+    manifest = _read_json(manifest_path)
+    if manifest is None or (manifest["input_size"], manifest["input_mtime_ns"]) != (size, mtime_ns):
+        # A new or changed input invalidates all previous progress.
+        for name in os.listdir(work_dir):
+            if name.startswith("shard-"):
+                os.remove(os.path.join(work_dir, name))
+        manifest = {"input_size": size, "input_mtime_ns": mtime_ns, "shards": shard_ranges(count, workers)}
+        _write_json(manifest_path, manifest)
+
+    jobs = [
+        (in_path, index_path, work_dir, shard, start, end, checkpoint_every)
+        for shard, (start, end) in enumerate(manifest["shards"])
+    ]
+    if workers == 1 or len(jobs) <= 1:
+        counts = [_score_shard_args(job) for job in jobs]
+    else:
+        # Imported here because loading multiprocessing slows down cold starts.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            counts = list(executor.map(_score_shard_args, jobs))
+
+    with open(out_path + ".tmp", "wb") as out_file:
+        for shard in range(len(jobs)):
+            with open(_shard_paths(work_dir, shard)[0], "rb") as shard_file:
+                shutil.copyfileobj(shard_file, out_file)
+    os.replace(out_path + ".tmp", out_path)
+    if not keep_shards:
+        _remove_work_files(work_dir)
+
+    return sum(p for p, _ in counts), sum(f for _, f in counts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a JSONL file of submissions in resumable shards.")
+    parser.add_argument("input", help="Submissions JSONL file.")
+    parser.add_argument("--out", required=True, help="Where to write the JSONL results.")
+    parser.add_argument("--workers", type=int, help="Worker processes and shards (default: CPU count).")
+    parser.add_argument("--work-dir", help="Directory for shard outputs and checkpoints (default: OUT.shards).")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, help="Records between checkpoints.")
+    parser.add_argument("--keep-shards", action="store_true", help="Keep the shard files after concatenating them.")
+    parser.add_argument("--index-only", action="store_true", help="Only build the offset index of the input.")
+    args = parser.parse_args(argv)
+
+    if args.index_only:
+        print(f"Wrote {build_index(args.input)}", file=sys.stderr)
+        return
+    try:
+        processed, failed = run_sharded(args.input, args.out, args.workers, args.work_dir, args.checkpoint_every, args.keep_shards)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Processed {processed} submissions ({failed} failed).", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import heapq
+import math
+
+class SpaceSaving:
+    """
+    The Space-Saving heavy-hitter sketch (Metwally et al., 2005).
+
+    Tracks the most frequent items of a stream in memory bounded by
+    `capacity`, however many distinct items the stream has. Every reported
+    count is an overestimate by at most `error_bound` (total / capacity once
+    the sketch is full), so any item more frequent than that is guaranteed
+    to be tracked. While fewer than `capacity` distinct items have been seen
+    the counts are exact.
+
+    Ties in `most_common` are broken by first occurrence, like Counter.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        self._order = {}  # Item -> sequence number of its insertion, for tie-breaking.
+        self._seq = 0
+        self._heap = []  # (count, seq, item) entries; stale ones are skipped lazily.
+
+    @classmethod
+    def with_error(cls, epsilon):
+        """Creates a sketch whose counts are off by at most `epsilon` x the stream length."""
+        if not 0 < epsilon <= 1:
+            raise ValueError("epsilon must be in (0, 1]")
+        return cls(math.ceil(1 / epsilon))
+
+    @property
+    def error_bound(self):
+        """The most any reported count can exceed the true count by."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return self.total // self.capacity
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], self._order[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            # Drop stale entries so the heap stays proportional to the capacity.
+            self._heap = [(count, self._order[item], item) for item, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """Removes and returns the currently least frequent tracked item."""
+        while True:
+            count, seq, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count and self._order[item] == seq:
+                return item
+
+    def add(self, item, count=1):
+        """Counts `count` more occurrences of `item`."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            self._order[item] = self._seq
+            self._seq += 1
+        else:
+            # Replace the minimum; the newcomer inherits its count as possible error.
+            evicted = self._pop_min()
+            floor = self.counts.pop(evicted)
+            del self.errors[evicted]
+            del self._order[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+            self._order[item] = self._seq
+            self._seq += 1
+        self._push(item)
+
+    def update(self, items):
+        """Counts every item of an iterable."""
+        for item in items:
+            self.add(item)
+
+    def most_common(self, k=None):
+        """Returns up to `k` (item, count) pairs, most frequent first."""
+        ranked = sorted(self.counts.items(), key=lambda pair: (-pair[1], self._order[pair[0]]))
+        return ranked if k is None else ranked[:k]
+
+    def most_common_with_errors(self, k=None):
+        """Returns up to `k` (item, count, error) triples, most frequent first."""
+        return [(item, count, self.errors[item]) for item, count in self.most_common(k)]
+
+    def _floor(self):
+        """The count an untracked item may have had: the minimum once full, else 0."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def merge(self, other):
+        """
+        Returns a new sketch that summarizes both streams (Agarwal et al., 2012).
+
+        An item missing from one sketch is credited with that sketch's floor
+        count, which is added to its error as well, and the `capacity` largest
+        counts are kept. The merged counts stay within `error_bound` of the
+        combined stream, so merging is safe to repeat across any number of
+        shards. Ties keep first-occurrence order, this sketch's items first.
+        """
+        if other.capacity != self.capacity:
+            raise ValueError("can only merge sketches with the same capacity")
+        floor_a, floor_b = self._floor(), other._floor()
+        items = self._ordered() + [item for item in other._ordered() if item not in self.counts]
+        merged = []
+        for seq, item in enumerate(items):
+            count = self.counts.get(item, floor_a) + other.counts.get(item, floor_b)
+            error = self.errors.get(item, floor_a) + other.errors.get(item, floor_b)
+            merged.append((count, seq, item, error))
+        merged.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        result = SpaceSaving(self.capacity)
+        result.total = self.total + other.total
+        for count, seq, item, error in sorted(merged[:self.capacity], key=lambda entry: entry[1]):
+            result._insert(item, count, error)
+        return result
+
+    def _ordered(self):
+        return sorted(self.counts, key=self._order.__getitem__)
+
+    def _insert(self, item, count, error):
+        self.counts[item] = count
+        self.errors[item] = error
+        self._order[item] = self._seq
+        self._seq += 1
+        self._push(item)
+
+    def to_dict(self):
+        """Returns a JSON-serializable representation, items in first-occurrence order."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": [[item, self.counts[item], self.errors[item]] for item in self._ordered()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        for item, count, error in data["items"]:
+            sketch._insert(item, count, error)
+        return sketch
@@ -0,0 +1,87 @@
+"""
+Seeded generator of synthetic respondents for benchmarks and load tests.
+
+Answers mix words and phrases from the NLP lexicons with filler vocabulary,
+so they exercise sentiment, tagging and keyword extraction the way real
+answers do. The same seed always gives the same corpus.
+
+    python synthetic_data.py --count 10000 --length 40 --out submissions.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+
+from mcq_module import QUESTIONS
+from nlp_module import BEHAVIORAL_TAG_MAP, NEGATIVE_WORDS, POSITIVE_WORDS
+
+FILLER_WORDS = [
+    "i", "my", "the", "a", "to", "and", "of", "in", "it", "is", "when", "at",
+    "work", "day", "task", "tasks", "meeting", "meetings", "email", "emails",
+    "project", "team", "boss", "home", "office", "afternoon", "evening", "week",
+    "usually", "often", "sometimes", "always", "really", "very", "just", "then",
+    "start", "finish", "feel", "get", "keep", "try", "need", "want", "because",
+    "coffee", "lunch", "desk", "laptop", "music", "quiet", "noise", "hours",
+]
+
+LEXICON_PHRASES = POSITIVE_WORDS + NEGATIVE_WORDS + [
+    phrase for phrases in BEHAVIORAL_TAG_MAP.values() for phrase in phrases
+]
+
+DESCRIPTIVE_KEYS = ["challenge", "focus_time"]
+
+def generate_answer(rng, length, lexicon_ratio=0.15):
+    """
+    Generates an answer of roughly `length` words.
+
+    Args:
+        rng (random.Random): The random source.
+        length (int): Number of words (multi-word phrases count as one).
+        lexicon_ratio (float): Share of words drawn from the lexicons.
+    """
+    words = [
+        rng.choice(LEXICON_PHRASES) if rng.random() < lexicon_ratio else rng.choice(FILLER_WORDS)
+        for _ in range(length)
+    ]
+    # Sprinkle in punctuation and capitals so the text looks like real input.
+    sentences = []
+    for i in range(0, len(words), 12):
+        sentence = " ".join(words[i:i + 12])
+        sentences.append(sentence[:1].upper() + sentence[1:] + rng.choice([".", ".", "!", ","]))
+    return " ".join(sentences)
+
+def generate_choices(rng):
+    """Generates one respondent's 1-based MCQ choices."""
+    return [rng.randint(1, 4) for _ in QUESTIONS]
+
+def generate_submissions(count, length=20, seed=0, lexicon_ratio=0.15):
+    """
+    Yields `count` submissions in the batch-mode format (see main.process_submission).
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "id": i,
+            "mcq_choices": generate_choices(rng),
+            "descriptive_answers": {key: generate_answer(rng, length, lexicon_ratio) for key in DESCRIPTIVE_KEYS},
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic submissions as JSONL.")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--length", type=int, default=20, help="Words per descriptive answer.")
+    parser.add_argument("--lexicon-ratio", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="-", help="Output file ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        for submission in generate_submissions(args.count, args.length, args.seed, args.lexicon_ratio):
+            out.write(json.dumps(submission, separators=(",", ":")) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from aggregates import CohortSummary
+from result_types import AssessmentResult
+
+SUBMISSIONS = [
+    {"mcq_choices": [1, 2, 3, 4, 1, 2, 3, 4, 1, 2], "descriptive_answers": {"challenge": "I put off work, my phone distracts me", "focus_time": "Early morning"}},
+    {"mcq_choices": [4, 4, 4, 4, 4, 4, 4, 4, 4, 4], "descriptive_answers": {"challenge": "I love my calm, focused days"}},
+]
+
+def test_add_and_add_result_agree(regex_tokenizer):
+    from_dicts, from_results = CohortSummary(), CohortSummary()
+    for submission in SUBMISSIONS:
+        result = AssessmentResult.from_submission(submission)
+        from_dicts.add(result.to_dict())
+        from_results.add_result(result)
+    assert from_dicts.to_dict() == from_results.to_dict()
+    assert sum(from_dicts.report()["sentiment_counts"].values()) == 3
+    assert list(from_dicts.report()["sentiment_counts"]) == ["Negative", "Neutral", "Positive"]
@@ -0,0 +1,31 @@
+import nlp_module
+from analysis_cache import make_key
+
+def test_key_ignores_case():
+    assert make_key("Phone", "fp") == make_key("phone", "fp")
+
+def test_key_keeps_surrounding_whitespace():
+    assert make_key("I put ", "fp") != make_key("I put", "fp")
+
+def test_cached_edges_match_the_exact_text(stub_stop_words):
+    answers = {"a": "I put ", "b": "off work"}
+    expected = nlp_module.analyze_descriptive_answers(answers, tokenizer="regex")
+    assert expected["all_tags"] == []
+
+    nlp_module.enable_cache(maxsize=100)
+    try:
+        nlp_module.analyze_partial("I put", tokenizer="regex")  # Same text, without the trailing space.
+        assert nlp_module.analyze_descriptive_answers(answers, tokenizer="regex") == expected
+    finally:
+        nlp_module.disable_cache()
+
+def test_enable_cache_keeps_entries_of_other_tokenizers(stub_stop_words, tmp_path):
+    db = str(tmp_path / "cache.db")
+    nlp_module.enable_cache(maxsize=100, sqlite_path=db)
+    try:
+        nlp_module.analyze_partial("My phone distracts me", tokenizer="regex")
+        cache = nlp_module.enable_cache(maxsize=100, sqlite_path=db)  # Another worker starting up.
+        assert cache.purge_stale(nlp_module.get_lexicon_version()) == 0
+        assert cache.purge_stale("an older lexicon") == 1
+    finally:
+        nlp_module.disable_cache()
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from cohort_module import score_choice_matrix
+from mcq_module import score_mcq_choices
+
+def test_matches_per_respondent_scoring():
+    choices = [[1, 2, 3, 4, 1, 2, 3, 4, 1, 2], [4, 4, 4, 4, 4, 4, 4, 4, 4, 4]]
+    scores = score_choice_matrix(choices)
+    for row, choice_row in zip(scores, choices):
+        _, answers = score_mcq_choices(choice_row)
+        assert row.tolist() == [answers[f"Q{i+1}"]["score"] for i in range(len(choice_row))]
+
+@pytest.mark.parametrize("choices", [[[1.7] * 10], np.ones((2, 10)), [[True] * 10], [["1"] * 10]])
+def test_non_integer_choices_are_rejected(choices):
+    with pytest.raises(ValueError):
+        score_choice_matrix(choices)
+
+@pytest.mark.parametrize("choices", [[[0] * 10], [[5] * 10], [[1] * 9]])
+def test_out_of_range_choices_are_rejected(choices):
+    with pytest.raises(ValueError):
+        score_choice_matrix(choices)
@@ -0,0 +1,30 @@
+import random
+
+import nlp_module
+from corpus_module import analyze_corpus, build_matrices
+from synthetic_data import generate_answer
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Phone",
+    "I put\x00off work",  # A NUL inside a text must not split it.
+    "no time\x00no energy",
+    "planning plan PLAN, plan!",
+    "latelate late",
+    "my “focus” time—mornings",
+]
+
+def test_matches_analyze_text(stub_stop_words):
+    rng = random.Random(0)
+    texts = EDGE_CASES + [generate_answer(rng, 30) for _ in range(300)]
+    assert analyze_corpus(texts, tokenizer="regex") == [nlp_module.analyze_text(t, tokenizer="regex") for t in texts]
+
+def test_empty_batch(stub_stop_words):
+    assert analyze_corpus([], tokenizer="regex") == []
+
+def test_keyword_ties_and_corpus_counts(stub_stop_words):
+    texts = ["work home work home desk", "desk desk home"]
+    matrices = build_matrices(texts, tokenizer="regex")
+    assert matrices.keywords(k=2) == [["work", "home"], ["desk", "home"]]
+    assert matrices.corpus_keywords(k=3) == [("home", 3), ("desk", 3), ("work", 2)]
@@ -0,0 +1,42 @@
+import random
+
+import nlp_module
+from lexicon_matcher import LexiconMatcher
+from synthetic_data import generate_answer
+
+EDGE_CASES = [
+    "",
+    "I always put off my work",
+    "I put\noff work",  # Not "put off": the check is a plain substring test.
+    "I eat chocolate when I'm late",  # "late" also matches inside "chocolate".
+    "Deadlines, deadlines... NO TIME and no energy",
+    "I can't start; I'm distracted by my phone",
+    "Calm mornings with a morning routine are good",
+    "stressed stressed stressed but focused",
+    "plan plans planning planned",
+]
+
+def baseline_sentiment(text):
+    """The per-entry substring scan analyze_sentiment used before the matcher."""
+    text_lower = text.lower()
+    pos_count = sum(1 for word in nlp_module.POSITIVE_WORDS if word in text_lower)
+    neg_count = sum(1 for word in nlp_module.NEGATIVE_WORDS if word in text_lower)
+    return nlp_module.sentiment_from_counts(pos_count, neg_count)
+
+def baseline_tags(text):
+    """The per-entry substring scan get_behavioral_tags used before the matcher."""
+    text_lower = text.lower()
+    return [tag for tag, keywords in nlp_module.BEHAVIORAL_TAG_MAP.items() if any(keyword in text_lower for keyword in keywords)]
+
+def test_matches_the_substring_scan():
+    rng = random.Random(0)
+    texts = EDGE_CASES + [generate_answer(rng, 40) for _ in range(300)]
+    for text in texts:
+        assert nlp_module.analyze_sentiment(text) == baseline_sentiment(text), text
+        assert nlp_module.get_behavioral_tags(text) == baseline_tags(text), text
+
+def test_overlapping_and_duplicate_phrases():
+    matcher = LexiconMatcher({"a": ["he", "she", "hers", "he"], "b": ["his", "", "she"]})
+    assert matcher.find("ushers") == {"he", "she", "hers", ""}
+    # Duplicates and the empty phrase count once per entry, like `sum(p in text for p in lexicon)`.
+    assert matcher.match("ushers") == {"a": 4, "b": 2}
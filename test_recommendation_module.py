@@ -0,0 +1,24 @@
+import json
+import os
+
+import recommendation_module
+
+def test_broken_catalog_file_is_parsed_once(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(recommendation_module.RECOMMENDATIONS))
+    monkeypatch.setattr(recommendation_module, "_watched_file", None)
+    monkeypatch.setattr(recommendation_module, "_watched_mtime", None)
+    monkeypatch.setattr(recommendation_module, "_compiled", recommendation_module._compiled)
+    monkeypatch.setattr(recommendation_module, "RECOMMENDATIONS", recommendation_module.RECOMMENDATIONS)
+    recommendation_module.watch_catalog_file(str(path))
+    good = recommendation_module.get_catalog()
+
+    path.write_text("{ not json")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    loads = []
+    load_catalog = recommendation_module.load_catalog
+    monkeypatch.setattr(recommendation_module, "load_catalog", lambda p: loads.append(p) or load_catalog(p))
+    for _ in range(3):
+        assert recommendation_module.get_catalog() is good
+    assert len(loads) == 1
@@ -0,0 +1,12 @@
+import pytest
+
+from main import process_submission
+from result_types import AssessmentResult
+
+CHOICES = [1, 2, 3, 4, 1, 2, 3, 4, 1, 2]
+ANSWERS = {"challenge": "I put off work, my phone distracts me", "focus_time": "Early morning"}
+
+@pytest.mark.parametrize("extra", [{}, {"id": None}, {"id": 0}, {"id": "abc"}])
+def test_to_dict_matches_process_submission(regex_tokenizer, extra):
+    submission = {**extra, "mcq_choices": CHOICES, "descriptive_answers": ANSWERS}
+    assert AssessmentResult.from_submission(submission).to_dict() == process_submission(submission)
@@ -0,0 +1,34 @@
+import io
+import json
+
+from main import run_batch
+from result_types import AssessmentResult
+from results_store import ResultsStore
+
+CHOICES = [1, 2, 3, 4, 1, 2, 3, 4, 1, 2]
+
+def make_result(answers):
+    return AssessmentResult.from_submission({"mcq_choices": CHOICES, "descriptive_answers": answers})
+
+def test_answer_keys_grow_with_new_answers(regex_tokenizer, tmp_path):
+    store = ResultsStore(str(tmp_path))
+    with store.writer(segment_rows=1) as writer:
+        writer.append(make_result({"challenge": "I put off work"}))
+        writer.append(make_result({"challenge": "My phone distracts me", "focus_time": "Early morning"}))
+    with store.writer() as writer:
+        writer.append(make_result({"focus_time": "Late at night", "goal": "Finish my thesis"}))
+    assert len(store) == 3
+    assert store.answer_keys == ["challenge", "focus_time", "goal"]
+    assert [segment.meta["answer_keys"] for segment in store.segments()] == [["challenge"], ["challenge", "focus_time"], ["focus_time", "goal"]]
+    assert sum(sum(row.values()) for row in store.sentiment_by_profile().values()) == 5
+
+def test_store_does_not_change_batch_output(regex_tokenizer, tmp_path):
+    lines = [
+        json.dumps({"mcq_choices": CHOICES, "descriptive_answers": {"challenge": "I put off work"}}),
+        json.dumps({"mcq_choices": CHOICES, "descriptive_answers": {"challenge": "I put off work", "focus_time": "Early morning"}}),
+    ]
+    plain, stored = io.StringIO(), io.StringIO()
+    assert run_batch(lines, plain) == (2, 0)
+    with ResultsStore(str(tmp_path)).writer() as writer:
+        assert run_batch(lines, stored, writer) == (2, 0)
+    assert stored.getvalue() == plain.getvalue()
@@ -0,0 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from service import AssessmentService
+
+async def assess_all(executor, bodies):
+    service = AssessmentService(executor, max_wait_ms=1)
+    service.batcher.start()
+    try:
+        return [await service.assess(body) for body in bodies]
+    finally:
+        await service.batcher.stop()
+
+def test_bad_submission_is_a_client_error():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        [(status, payload)] = asyncio.run(assess_all(executor, [b'{"descriptive_answers": {}}']))
+    assert status == 400
+    assert payload["error"].startswith("KeyError")
+
+def test_executor_failure_is_a_server_error():
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()  # Submitting to it now raises, like a broken process pool.
+    results = asyncio.run(assess_all(executor, [b'{"descriptive_answers": {}}', b"{}"]))
+    assert [status for status, _ in results] == [500, 500]
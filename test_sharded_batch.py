@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from sharded_batch import JsonlIndex, run_sharded, shard_ranges
+
+def test_shard_ranges_are_contiguous():
+    assert shard_ranges(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert shard_ranges(0, 4) == [(0, 0)]
+
+def test_index_random_access(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b'{"id": 0}\n\n{"id": 2}')
+    index = JsonlIndex.open(str(path))
+    try:
+        assert len(index) == 3
+        assert index.line(1) == b"\n"
+        assert index.record(2) == {"id": 2}
+    finally:
+        index.close()
+
+def test_refuses_foreign_work_dir(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b"")
+    work_dir = tmp_path / "keepme"
+    work_dir.mkdir()
+    (work_dir / "important.txt").write_text("data")
+
+    with pytest.raises(ValueError):
+        run_sharded(str(path), str(tmp_path / "out.jsonl"), workers=1, work_dir=str(work_dir))
+    assert (work_dir / "important.txt").exists()
+
+def test_removes_only_its_own_files(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b"")
+    out_path = tmp_path / "out.jsonl"
+
+    assert run_sharded(str(path), str(out_path), workers=2) == (0, 0)
+    assert out_path.read_bytes() == b""
+    assert not os.path.exists(str(out_path) + ".shards")
+
+def test_redoes_a_shard_whose_output_is_missing(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_bytes(b"".join(b'{"line": %d}\n' % i for i in range(6)))  # Each scores as an error record.
+    out_path = tmp_path / "out.jsonl"
+    work_dir = tmp_path / "work"
+
+    assert run_sharded(str(path), str(out_path), workers=2, work_dir=str(work_dir), checkpoint_every=1, keep_shards=True) == (0, 6)
+    expected = out_path.read_bytes()
+    os.remove(work_dir / "shard-00000.jsonl")  # Its checkpoint survives.
+
+    assert run_sharded(str(path), str(out_path), workers=1, work_dir=str(work_dir)) == (0, 6)
+    assert out_path.read_bytes() == expected
+    assert b"\0" not in expected and expected.count(b"\n") == 6
@@ -0,0 +1,34 @@
+import io
+import random
+
+import pytest
+
+import nlp_module
+from synthetic_data import generate_answer
+
+EDGE_CASES = [
+    "",
+    "I always put off my work",  # "put off" is split across chunks at most chunk sizes.
+    "I eat chocolate when I'm late",  # "late" also matches inside "chocolate".
+    "Deadlines, deadlines... NO TIME and no energy",
+    "focus focus work work desk desk home",  # Keyword ties keep first-occurrence order.
+    "distracted\nby my phone\tall  day",
+]
+
+def as_stream_result(analysis):
+    return {key: analysis[key] for key in ("sentiment", "keywords", "tags")}
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096])
+def test_matches_analyze_text(stub_stop_words, chunk_size):
+    rng = random.Random(chunk_size)
+    texts = EDGE_CASES + [generate_answer(rng, 60) for _ in range(100)]
+    for text in texts:
+        expected = nlp_module.analyze_text(text, tokenizer="regex")
+        assert as_stream_result(nlp_module.analyze_stream(text, tokenizer="regex", chunk_size=chunk_size)) == expected, text
+
+def test_file_and_chunk_iterable_sources(stub_stop_words):
+    text = "I keep putting things off. I put off my plan, then I am late."
+    expected = nlp_module.analyze_text(text, tokenizer="regex")
+    assert as_stream_result(nlp_module.analyze_stream(io.StringIO(text), tokenizer="regex", chunk_size=5)) == expected
+    chunks = [text[:32], text[32:33], text[33:]]  # Splits "put off" as "put" + " " + "off".
+    assert as_stream_result(nlp_module.analyze_stream(chunks, tokenizer="regex")) == expected
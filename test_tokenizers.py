@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+import nlp_module
+from synthetic_data import generate_answer
+
+nltk_tokenize = pytest.importorskip("nltk.tokenize")
+
+NORMAL_ANSWERS = [
+    "I procrastinate a lot and my phone keeps distracting me.",
+    "Mornings are best, right after coffee, before the emails start!",
+    "I can't start big tasks; I put off planning until the deadline.",
+    "Honestly? I'm exhausted, overwhelmed and tired of constant interruptions...",
+    "Late afternoon (around 4-6pm) when the office is quiet.",
+]
+
+@pytest.fixture
+def nltk_without_data(monkeypatch, stub_stop_words):
+    """
+    Lets word_tokenize run without the punkt models. Punctuation is removed
+    before tokenizing, so there are no sentence boundaries to find anyway.
+    """
+    monkeypatch.setattr(nltk_tokenize, "sent_tokenize", lambda text, language="english": [text])
+
+def keywords(text):
+    return {name: nlp_module.extract_keywords(text, tokenizer=name) for name in ("nltk", "regex")}
+
+def test_backends_agree_on_normal_answers(nltk_without_data):
+    rng = random.Random(0)
+    answers = NORMAL_ANSWERS + [generate_answer(rng, 40) for _ in range(200)]
+    for text in answers:
+        result = keywords(text)
+        assert result["nltk"] == result["regex"], text
+
+# The differences documented in nlp_module.regex_tokenize.
+
+def test_cannot_stays_one_word(nltk_without_data):
+    # NLTK splits it into the stopwords "can" and "not".
+    assert keywords("I cannot focus") == {"nltk": ["focus"], "regex": ["cannot", "focus"]}
+
+def test_gonna_stays_one_word(nltk_without_data):
+    assert keywords("gonna focus") == {"nltk": ["gon", "na", "focus"], "regex": ["gonna", "focus"]}
+
+def test_curly_quotes_and_em_dashes_stay_attached(nltk_without_data):
+    result = keywords("my “focus” time—mornings")
+    assert result["nltk"] == ["focus", "time", "mornings"]
+    assert result["regex"] == []